@@ -1,32 +1,97 @@
 import asyncio
+import signal
 import sys
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
 
 from src.config import config, logger
-from src.database.db import init_db
+from src.database.crud import user_cache
+from src.database.db import get_db, init_db, close_db
+from src.storage import create_storage, create_events_isolation
+from src.storage.sqlite import SQLiteStorage
+from src.utils.blobs import blob_gc_loop
+from src.services.file_handling import start_document_pipeline, stop_document_pipeline
+from src.services.outbox import start_outbox_worker, stop_outbox_worker
+from src.services.subscriptions import load_subscription_index, subscription_refresh_loop
+from src.utils.fileio import shutdown_io_executor
+from src.utils.loop_monitor import LoopLagMonitor
+from src.utils.stats import register_stats, stats_log_loop
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    from src.webhook import WebhookServer
+
+    server = WebhookServer(dp, bot, config.webhook)
+    register_stats("webhook", server.stats)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await dp.emit_startup(bot=bot)
+    await server.start()
+    try:
+        await stop_event.wait()
+    finally:
+        await server.stop()
+        await dp.emit_shutdown(bot=bot)
+
 
 async def main():
     logger.info("Запуск бота для грузоперевозок")
 
-    storage = MemoryStorage()
+    monitor = LoopLagMonitor(config.monitor.loop_lag_threshold, config.monitor.loop_lag_interval)
+    if config.monitor.loop_lag_enabled:
+        monitor.start()
+
+    await init_db()
+
+    storage = create_storage()
+    events_isolation = create_events_isolation(storage)
     bot = Bot(token=config.bot.token, default=DefaultBotProperties(parse_mode="HTML"))
-    dp = Dispatcher(storage=storage)
+    dp = Dispatcher(storage=storage, events_isolation=events_isolation)
 
     from src.handlers import register_all_handlers
     register_all_handlers(dp, bot)  # <-- ПЕРЕДАЁМ bot сюда
 
     from src.middlewares import register_all_middlewares
-    register_all_middlewares(dp)
+    register_all_middlewares(dp, bot)
 
-    await init_db()
+    await load_subscription_index()
+    await start_document_pipeline()
+    start_outbox_worker(bot)
+    gc_task = asyncio.create_task(blob_gc_loop())
+    refresh_task = asyncio.create_task(subscription_refresh_loop())
 
+    register_stats("user_cache", user_cache.stats)
+    register_stats("loop", monitor.stats)
+    if get_db().write_queue is not None:
+        register_stats("write_queue", get_db().write_queue.stats)
+    if isinstance(storage, SQLiteStorage):
+        register_stats("fsm", storage.stats)
+    stats_task = None
+    if config.monitor.stats_interval > 0:
+        stats_task = asyncio.create_task(stats_log_loop(config.monitor.stats_interval))
     try:
-        await bot.delete_webhook(drop_pending_updates=True)
-        await dp.start_polling(bot)
+        if config.webhook.enabled:
+            await run_webhook(dp, bot)
+        else:
+            # Накопившиеся за время деплоя апдейты не выбрасываем
+            await bot.delete_webhook(drop_pending_updates=False)
+            await dp.start_polling(bot)
     finally:
+        gc_task.cancel()
+        refresh_task.cancel()
+        if stats_task is not None:
+            stats_task.cancel()
+        await stop_outbox_worker()
+        await stop_document_pipeline()
         await bot.session.close()
+        await storage.close()
+        await events_isolation.close()
+        await close_db()
+        await monitor.stop()
+        shutdown_io_executor()
         logger.info("Бот остановлен")
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+"""Конкурентное принятие заказа: прежнее чтение-проверка-запись против условного UPDATE.
+
+    python scripts/bench_accept.py [--carriers 50] [--orders 100]
+
+Для каждого варианта на --orders свежих заказов одновременно запускается
+--carriers попыток принять заказ. Печатаются медиана, p95 и p99 задержки
+попытки и сколько перевозчиков получили ответ «заказ принят». Завершается
+с кодом 1, если у условного UPDATE хотя бы у одного заказа победителей не
+ровно один; у прежнего варианта лишние победители ожидаемы.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+from common import run, scratch_dir
+
+from src.database import crud
+from src.database.db import close_db, get_db, init_db
+from src.database.models import Order, User
+
+
+async def old_accept(order_id: int, carrier_id: int) -> Optional[Order]:
+    # Прежний обработчик: прочитать заказ, проверить статус, переписать строку
+    order = await crud.get_order(order_id)
+    if not order or order.status != "new":
+        return None
+    order.carrier_id = carrier_id
+    order.status = "accepted"
+    await crud.update_order(order)
+    return order
+
+
+async def new_accept(order_id: int, carrier_id: int) -> Optional[Order]:
+    return await crud.accept_order_atomic(order_id, carrier_id)
+
+
+async def race(accept, order_id: int, carriers: int):
+    async def attempt(carrier_id: int):
+        start = time.perf_counter()
+        order = await accept(order_id, carrier_id)
+        return order, time.perf_counter() - start
+
+    results = await asyncio.gather(*(attempt(1000 + i) for i in range(carriers)))
+    winners = [order for order, _ in results if order is not None]
+    return winners, [elapsed for _, elapsed in results]
+
+
+async def run_path(accept, orders: int, carriers: int):
+    """Гонки на свежих заказах; возвращает (число победителей по заказам, неверные заказы, задержки)"""
+    winner_counts, failures, latencies = [], 0, []
+    for _ in range(orders):
+        order_id = await crud.add_order(Order(
+            sender_id=1, cargo_type="Стандартный", weight=100, dimensions=None,
+            pickup_address="Москва", delivery_address="Казань",
+            pickup_date="01.01.2030", comment=None
+        ))
+        winners, elapsed = await race(accept, order_id, carriers)
+        latencies.extend(elapsed)
+        winner_counts.append(len(winners))
+
+        async with get_db().reader() as conn:
+            cursor = await conn.execute(
+                "SELECT status, carrier_id FROM orders WHERE order_id = ?", (order_id,)
+            )
+            status, carrier_id = await cursor.fetchone()
+
+        # Итоговый перевозчик должен совпадать с единственным, кому сказали «принят»
+        failures += not (len(winners) == 1 and status == "accepted" and carrier_id == winners[0].carrier_id)
+    latencies.sort()
+    return winner_counts, failures, latencies
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * share))] * 1e3
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carriers", type=int, default=50)
+    parser.add_argument("--orders", type=int, default=100)
+    args = parser.parse_args()
+
+    with scratch_dir():
+        await init_db()
+        try:
+            await crud.add_user(User(user_id=1, full_name="Sender", phone="+70000000000", role="sender"))
+            for i in range(args.carriers):
+                await crud.add_user(User(user_id=1000 + i, full_name=f"C{i}", phone="+7", role="carrier"))
+
+            results = {
+                "чтение+проверка+UPDATE": await run_path(old_accept, args.orders, args.carriers),
+                "условный UPDATE": await run_path(new_accept, args.orders, args.carriers),
+            }
+        finally:
+            await close_db()
+
+    print(f"{args.orders} заказов x {args.carriers} одновременных accept")
+    print(f"{'':<24}{'медиана':>10}{'p95':>10}{'p99':>10}{'один победитель':>18}{'победителей':>14}")
+    for title, (winner_counts, failures, latencies) in results.items():
+        print(
+            f"{title:<24}"
+            + "".join(f"{percentile(latencies, share):>7.2f} мс" for share in (0.5, 0.95, 0.99))
+            + f"{f'{args.orders - failures} из {args.orders}':>18}"
+            + f"{f'{min(winner_counts)}-{max(winner_counts)}':>14}"
+        )
+
+    _, failures, _ = results["условный UPDATE"]
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,73 @@
+"""Маршрутизация кнопок reply-клавиатур: цепочка F.text == ... против ButtonTable.
+
+    python scripts/bench_buttons.py [--repeat 2000]
+
+Для каждого числа кнопок собираются два Dispatcher с пустыми обработчиками:
+один регистрирует кнопки фильтрами F.text == ..., как раньше, другой —
+через ButtonTable. За ними стоит роутер, принимающий любой текст, как
+сценарии с вводом данных. Время — цена одного апдейта через feed_update
+для последней зарегистрированной кнопки и для свободного текста, который
+проходит мимо всех кнопок.
+"""
+import argparse
+
+from aiogram import Bot, Dispatcher, F, Router
+
+from common import FakeSession, message_update, per_call_us_async, run
+
+from src.handlers.buttons import ButtonTable
+
+SIZES = (5, 10, 20, 50, 100)
+FREE_TEXT = "просто текст"
+
+
+async def button_handler(message):
+    pass
+
+
+async def text_handler(message):
+    pass
+
+
+def build(count: int, table: bool) -> Dispatcher:
+    dp = Dispatcher()
+    texts = [f"кнопка {i}" for i in range(count)]
+    if table:
+        buttons = ButtonTable()
+        for text in texts:
+            buttons.handler(text)(button_handler)
+        dp.include_router(buttons.router)
+    else:
+        router = Router()
+        for text in texts:
+            router.message.register(button_handler, F.text == text)
+        dp.include_router(router)
+
+    tail = Router()
+    tail.message.register(text_handler)
+    dp.include_router(tail)
+    return dp
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    bot = Bot(token="42:TEST", session=FakeSession())
+
+    print(f"{'кнопок':>7}{'последняя кнопка':>26}{'свободный текст':>26}")
+    print(f"{'':>7}{'F.text':>13}{'таблица':>13}{'F.text':>13}{'таблица':>13}")
+    for count in SIZES:
+        old, new = build(count, table=False), build(count, table=True)
+        button, text = message_update(1, f"кнопка {count - 1}"), message_update(1, FREE_TEXT)
+        results = [
+            await per_call_us_async(lambda: dp.feed_update(bot, update), args.repeat)
+            for update in (button, text)
+            for dp in (old, new)
+        ]
+        print(f"{count:>7}" + "".join(f"{us:>9.0f} мкс" for us in results))
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,100 @@
+"""Маршрутизация инлайн-кнопок: цепочка F.data.startswith против таблицы префиксов.
+
+    python scripts/bench_callbacks.py [--repeat 5000]
+
+Оба варианта собраны на Dispatcher с пустыми обработчиками, так что время —
+это цена маршрутизации одного апдейта через feed_update. Старый вариант
+повторяет прежние фильтры обработчиков в порядке регистрации и разбор
+split(":") + int(); новый — CallbackTable со схемами из src/utils/callbacks.py.
+"""
+import argparse
+
+from aiogram import Bot, Dispatcher, F, Router
+
+from common import FakeSession, callback_update, per_call_us_async, run
+
+from src.handlers.callbacks import CallbackTable
+from src.utils import callbacks as schemas
+
+# Префиксы в порядке, в котором их проверяли роутеры до перехода на схемы
+OLD_FILTERS = [
+    F.data.startswith("stage:"),
+    F.data.startswith("orders_page:"),
+    F.data.startswith("view_order:"),
+    F.data.startswith("accept_order:"),
+    F.data == "my_orders_summary",
+    F.data.startswith("my_orders:"),
+    F.data.startswith("mark_delivered:"),
+    F.data.startswith("confirm_delivery:"),
+    F.data.startswith("view_documents:"),
+    F.data.startswith("sub_delete:"),
+]
+
+SCHEMAS = [
+    schemas.DeliveryStageUpdate, schemas.OrdersPage, schemas.ViewOrder, schemas.AcceptOrder,
+    schemas.MyOrdersSummary, schemas.MyOrders, schemas.MarkDelivered, schemas.ConfirmDelivery,
+    schemas.ViewDocuments, schemas.DeleteSubscription,
+]
+
+CASES = [
+    ("первый префикс", "stage:loading:15", schemas.DeliveryStageUpdate(stage=schemas.DeliveryStage.loading, order_id=15).pack()),
+    ("последний префикс", "sub_delete:7", schemas.DeleteSubscription(sub_id=7).pack()),
+    ("страница с курсором", "orders_page:3:n:20250314161606.12",
+     schemas.OrdersPage(page=3, direction="n", cursor="20250314161606.12").pack()),
+    ("чужая кнопка", "confirm", "confirm"),
+]
+
+
+async def old_handler(callback):
+    # Прежние обработчики разбирали данные вручную
+    callback.data.split(":")
+
+
+async def new_handler(callback, callback_data):
+    pass
+
+
+async def foreign_handler(callback):
+    pass
+
+
+def build(table: bool) -> Dispatcher:
+    dp = Dispatcher()
+    if table:
+        callbacks = CallbackTable()
+        for schema in SCHEMAS:
+            callbacks.handler(schema)(new_handler)
+        dp.include_router(callbacks.router)
+    else:
+        router = Router()
+        for callback_filter in OLD_FILTERS:
+            router.callback_query.register(old_handler, callback_filter)
+        dp.include_router(router)
+
+    tail = Router()
+    tail.callback_query.register(foreign_handler, F.data == "confirm")
+    dp.include_router(tail)
+    return dp
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    bot = Bot(token="42:TEST", session=FakeSession())
+    old, new = build(table=False), build(table=True)
+
+    print(f"{'случай':<22}{'старый':>10}{'новый':>10}   callback_data")
+    for title, old_data, new_data in CASES:
+        old_update, new_update = callback_update(1, old_data), callback_update(1, new_data)
+        old_us = await per_call_us_async(lambda: old.feed_update(bot, old_update), args.repeat)
+        new_us = await per_call_us_async(lambda: new.feed_update(bot, new_update), args.repeat)
+        print(
+            f"{title:<22}{old_us:>7.1f} мкс{new_us:>7.1f} мкс   "
+            f"{old_data!r} ({len(old_data)} Б) -> {new_data!r} ({len(new_data)} Б)"
+        )
+
+
+if __name__ == "__main__":
+    run(main)
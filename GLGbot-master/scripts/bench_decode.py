@@ -0,0 +1,157 @@
+"""Декодирование заказов: строки aiosqlite.Row по имени против позиционного _to_order.
+
+    python scripts/bench_decode.py [--orders 10000] [--rounds 5]
+
+Старый вариант повторяет прежний CRUD: SELECT * с row_factory = aiosqlite.Row
+и сборка Order по именам колонок в обычный dataclass без __slots__. Новый —
+crud.get_available_orders_page(): явный список ORDER_COLUMNS, кортежи и
+Order(*row). Оба читают одни и те же заказы одним запросом.
+
+Время — медиана по --rounds прогонам без tracemalloc. Память считается
+отдельным прогоном под tracemalloc: пик во время чтения и сколько остаётся
+занято готовым списком заказов. Поток aiosqlite держит результат последнего
+запроса до следующего, поэтому перед замером удержанной памяти через те же
+соединения проходит пустой запрос.
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import aiosqlite
+
+from common import run, scratch_dir
+
+from src.database import crud
+from src.database.db import close_db, get_db, init_db
+
+
+@dataclass
+class OldOrder:
+    sender_id: int
+    cargo_type: str
+    weight: float
+    pickup_address: str
+    delivery_address: str
+    pickup_date: str
+    order_id: Optional[int] = None
+    carrier_id: Optional[int] = None
+    dimensions: Optional[str] = None
+    comment: Optional[str] = None
+    status: str = "new"
+    creation_date: datetime = None
+
+
+async def fill(count: int):
+    async with get_db().writer() as conn:
+        await conn.executemany(
+            """
+            INSERT INTO orders (sender_id, cargo_type, weight, dimensions, pickup_address,
+                                delivery_address, pickup_date, comment, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'new')
+            """,
+            [
+                (
+                    i % 500, "Стандартный", 100.0 + i, "120x80x100",
+                    f"г. Москва, ул. Ленина, {i}", f"г. Казань, склад {i % 40}",
+                    "01.06.2030", "Позвонить за час" if i % 3 else None,
+                )
+                for i in range(count)
+            ]
+        )
+
+
+async def release(conn: aiosqlite.Connection):
+    await (await conn.execute("SELECT 1")).fetchall()
+
+
+def old_reader(conn: aiosqlite.Connection):
+    async def read():
+        cursor = await conn.execute("SELECT * FROM orders WHERE status = 'new' ORDER BY creation_date DESC")
+        rows = await cursor.fetchall()
+        return [
+            OldOrder(
+                order_id=row['order_id'],
+                sender_id=row['sender_id'],
+                carrier_id=row['carrier_id'],
+                cargo_type=row['cargo_type'],
+                weight=row['weight'],
+                dimensions=row['dimensions'],
+                pickup_address=row['pickup_address'],
+                delivery_address=row['delivery_address'],
+                pickup_date=row['pickup_date'],
+                comment=row['comment'],
+                status=row['status'],
+                creation_date=row['creation_date']
+            )
+            for row in rows
+        ]
+
+    async def flush():
+        await release(conn)
+
+    return read, flush
+
+
+def new_reader(count: int):
+    async def read():
+        return await crud.get_available_orders_page(count)
+
+    async def flush():
+        # Очередь читателей отдаёт соединения по кругу: проходим все
+        for _ in range(get_db().read_pool_size):
+            async with get_db().reader() as conn:
+                await release(conn)
+
+    return read, flush
+
+
+async def measure(reader, rounds: int):
+    read, flush = reader
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        orders = await read()
+        timings.append(time.perf_counter() - started)
+    del orders
+    await flush()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    orders = await read()
+    await flush()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(orders), statistics.median(timings) * 1e3, (peak - before) / 1024, (retained - before) / 1024
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with scratch_dir():
+        await init_db()
+        try:
+            await fill(args.orders)
+            old_conn = await aiosqlite.connect(get_db().path)
+            old_conn.row_factory = aiosqlite.Row
+            try:
+                old = await measure(old_reader(old_conn), args.rounds)
+            finally:
+                await old_conn.close()
+            new = await measure(new_reader(args.orders), args.rounds)
+        finally:
+            await close_db()
+
+    print(f"{'':<24}{'заказов':>9}{'время':>12}{'пик памяти':>16}{'удержано':>14}")
+    for title, (count, ms, peak, retained) in (("aiosqlite.Row по имени", old), ("позиционный _to_order", new)):
+        print(f"{title:<24}{count:>9}{ms:>9.1f} мс{peak:>12.0f} КиБ{retained:>10.0f} КиБ")
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,110 @@
+"""Клавиатуры ответов: сборка на каждый ответ против готовых клавиатур и шаблонов.
+
+    python scripts/bench_keyboards.py [--repeat 20000]
+
+Старый вариант собирает клавиатуру через ReplyKeyboardBuilder /
+InlineKeyboardBuilder при каждом вызове: для статичных клавиатур это
+исходная функция под @prebuilt (__wrapped__) и _build_main_keyboard, для
+клавиатур заказа — прежний код, повторённый ниже. Новый — функции из
+src/keyboards. Время меряется для сборки и для сборки с сериализацией
+в параметры запроса (prepare_value сессии). Перед замером JSON обоих
+вариантов сверяется; при расхождении скрипт завершается с кодом 1.
+"""
+import argparse
+import sys
+
+from aiogram import Bot
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from common import FakeSession, per_call_us
+
+from src.keyboards import main_kb, orders_kb
+from src.utils.callbacks import AcceptOrder, OrdersPage, ViewDocuments, ViewOrder
+
+
+def old_accept_order_keyboard(order_id: int) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardBuilder()
+    kb.add(InlineKeyboardButton(text="✅ Принять заказ", callback_data=AcceptOrder(order_id=order_id).pack()))
+    kb.add(InlineKeyboardButton(text="👁️ Подробнее", callback_data=ViewOrder(order_id=order_id).pack()))
+    return kb.as_markup()
+
+
+def old_order_details_keyboard(order_id: int, status: str, user_role: str) -> InlineKeyboardMarkup:
+    # Ветки для остальных статусов устроены так же, замеряется новый заказ у перевозчика
+    kb = InlineKeyboardBuilder()
+    if status == "new" and user_role == "carrier":
+        kb.add(InlineKeyboardButton(text="✅ Принять заказ", callback_data=AcceptOrder(order_id=order_id).pack()))
+    kb.add(InlineKeyboardButton(text="📎 Документы", callback_data=ViewDocuments(order_id=order_id).pack()))
+    kb.add(InlineKeyboardButton(text="◀️ Назад", callback_data="back_to_orders"))
+    return kb.as_markup()
+
+
+def old_available_orders_keyboard(order_ids, page, total_pages, first_cursor, last_cursor) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardBuilder()
+    for order_id in order_ids:
+        kb.row(
+            InlineKeyboardButton(text=f"✅ Принять #{order_id}", callback_data=AcceptOrder(order_id=order_id).pack()),
+            InlineKeyboardButton(text=f"👁️ #{order_id}", callback_data=ViewOrder(order_id=order_id).pack()),
+        )
+    if total_pages > 1:
+        navigation = []
+        if page > 1:
+            prev_data = (
+                OrdersPage(page=1) if page == 2
+                else OrdersPage(page=page - 1, direction="p", cursor=first_cursor)
+            )
+            navigation.append(InlineKeyboardButton(text="◀️ Назад", callback_data=prev_data.pack()))
+        navigation.append(InlineKeyboardButton(text=f"Страница {page}/{total_pages}", callback_data="current_page"))
+        if page < total_pages:
+            navigation.append(InlineKeyboardButton(
+                text="▶️ Вперед",
+                callback_data=OrdersPage(page=page + 1, direction="n", cursor=last_cursor).pack()
+            ))
+        kb.row(*navigation)
+    return kb.as_markup()
+
+
+PAGE = ([5, 4, 3, 2, 1], 2, 3, "20250101000000.5", "20250101000000.1")
+
+CASES = [
+    ("главное меню", lambda: main_kb._build_main_keyboard("carrier"), lambda: main_kb.get_main_keyboard("carrier")),
+    ("отмена", main_kb.get_cancel_keyboard.__wrapped__, main_kb.get_cancel_keyboard),
+    ("тип груза", orders_kb.get_cargo_type_keyboard.__wrapped__, orders_kb.get_cargo_type_keyboard),
+    ("принять заказ", lambda: old_accept_order_keyboard(42), lambda: orders_kb.get_accept_order_keyboard(42)),
+    ("детали заказа", lambda: old_order_details_keyboard(42, "new", "carrier"),
+     lambda: orders_kb.get_order_details_keyboard(42, "new", "carrier")),
+    ("страница заказов (5 строк)", lambda: old_available_orders_keyboard(*PAGE),
+     lambda: orders_kb.get_available_orders_keyboard(*PAGE)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    session = FakeSession()
+    bot = Bot(token="42:TEST", session=session)
+
+    differs = [
+        title for title, old, new in CASES
+        if old().model_dump_json(exclude_none=True) != new().model_dump_json(exclude_none=True)
+    ]
+    if differs:
+        print(f"клавиатуры различаются: {', '.join(differs)}")
+        sys.exit(1)
+    print("JSON старых и новых клавиатур совпадает")
+
+    print(f"{'клавиатура':<28}{'сборка':>24}{'сборка + сериализация':>26}")
+    print(f"{'':<28}{'старая':>12}{'новая':>12}{'старая':>13}{'новая':>13}")
+    for title, old, new in CASES:
+        results = [per_call_us(build, args.repeat) for build in (old, new)] + [
+            per_call_us(lambda: session.prepare_value(build(), bot, {}), args.repeat)
+            for build in (old, new)
+        ]
+        print(f"{title:<28}" + "".join(f"{us:>8.2f} мкс" for us in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Подбор перевозчиков по подпискам: индекс против перебора всех подписок.
+
+    python scripts/bench_subscriptions.py [--subscriptions 100000] [--orders 1000]
+
+Подписки и заказы генерируются случайно с фиксированным зерном. Для части
+заказов результат индекса сверяется с прямым перебором; при расхождении
+скрипт завершается с кодом 1.
+"""
+import argparse
+import random
+import sys
+import time
+
+import common  # добавляет корень проекта в sys.path
+
+from src.database.models import Order, Subscription
+from src.services.subscriptions import MAX_CITY_WORDS, SubscriptionIndex, address_phrases
+from src.utils.helpers import parse_pickup_date
+
+CITIES = [
+    "москва", "санкт петербург", "казань", "нижний новгород", "екатеринбург",
+    "новосибирск", "самара", "ростов на дону", "уфа", "пермь",
+] + [f"город{i}" for i in range(190)]
+CARGO_TYPES = ["Стандартный", "Негабаритный", "Хрупкий", "Ценный"]
+
+
+def random_subscription(rng: random.Random, sub_id: int) -> Subscription:
+    low = rng.choice([None, 0, 100, 500, 1000, 5000])
+    high = None if rng.random() < 0.3 else (low or 0) + rng.choice([100, 500, 2000, 10000])
+    return Subscription(
+        sub_id=sub_id,
+        carrier_id=sub_id,
+        cargo_type=rng.choice(CARGO_TYPES + [None]),
+        min_weight=low,
+        max_weight=high,
+        pickup_city=rng.choice(CITIES) if rng.random() < 0.8 else None,
+        delivery_city=rng.choice(CITIES) if rng.random() < 0.5 else None,
+        date_from="2030-06-01" if rng.random() < 0.3 else None,
+        date_to="2030-06-30" if rng.random() < 0.1 else None,
+    )
+
+
+def random_order(rng: random.Random) -> Order:
+    return Order(
+        sender_id=1,
+        cargo_type=rng.choice(CARGO_TYPES),
+        weight=rng.uniform(1, 20000),
+        pickup_address=f"г. {rng.choice(CITIES).title()}, ул. Ленина, 1",
+        delivery_address=f"{rng.choice(CITIES).title()}, склад 5",
+        pickup_date=f"{rng.randint(1, 28):02d}.0{rng.randint(5, 7)}.2030",
+    )
+
+
+def linear_match(subscriptions, order: Order):
+    pickup = address_phrases(order.pickup_address, MAX_CITY_WORDS)
+    delivery = address_phrases(order.delivery_address, MAX_CITY_WORDS)
+    pickup_date = parse_pickup_date(order.pickup_date)
+    day = pickup_date.isoformat() if pickup_date else None
+
+    carriers = set()
+    for s in subscriptions:
+        if s.cargo_type and s.cargo_type != order.cargo_type:
+            continue
+        if s.min_weight is not None and order.weight < s.min_weight:
+            continue
+        if s.max_weight is not None and order.weight > s.max_weight:
+            continue
+        if s.pickup_city and s.pickup_city not in pickup:
+            continue
+        if s.delivery_city and s.delivery_city not in delivery:
+            continue
+        if (s.date_from or s.date_to) and (
+            day is None or (s.date_from and day < s.date_from) or (s.date_to and day > s.date_to)
+        ):
+            continue
+        carriers.add(s.carrier_id)
+    return carriers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscriptions", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--checked", type=int, default=50, help="сколько заказов сверить перебором")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    subscriptions = [random_subscription(rng, i) for i in range(1, args.subscriptions + 1)]
+    orders = [random_order(rng) for _ in range(args.orders)]
+
+    index = SubscriptionIndex()
+    started = time.perf_counter()
+    index.load(subscriptions)
+    load_ms = (time.perf_counter() - started) * 1e3
+
+    started = time.perf_counter()
+    matched = [index.match(order) for order in orders]
+    index_ms = (time.perf_counter() - started) / len(orders) * 1e3
+
+    checked = orders[:args.checked]
+    started = time.perf_counter()
+    expected = [linear_match(subscriptions, order) for order in checked]
+    linear_ms = (time.perf_counter() - started) / len(checked) * 1e3
+    mismatches = sum(a != b for a, b in zip(matched, expected))
+
+    churn = subscriptions[:10_000]
+    started = time.perf_counter()
+    for subscription in churn:
+        index.remove(subscription.sub_id)
+    for subscription in churn:
+        index.add(subscription)
+    churn_us = (time.perf_counter() - started) / (2 * len(churn)) * 1e6
+
+    print(f"{args.subscriptions} подписок, {args.orders} заказов")
+    print(f"загрузка индекса: {load_ms:.0f} мс; добавление/удаление подписки: {churn_us:.1f} мкс")
+    print(
+        f"индекс: {index_ms:.3f} мс на заказ, в среднем {sum(map(len, matched)) / len(matched):.1f} перевозчиков"
+    )
+    print(f"перебор: {linear_ms:.2f} мс на заказ (x{linear_ms / index_ms:.0f})")
+    print(f"совпадение с перебором: {len(checked) - mismatches} из {len(checked)}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Кэш пользователей: доля попаданий и задержка get_user с кэшем и без.
+
+    python scripts/bench_user_cache.py [--users 2000] [--requests 50000]
+
+Обращения распределены неравномерно (закон Ципфа): как и в боте, активная
+часть пользователей шлёт большую часть апдейтов.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from common import run, scratch_dir
+
+from src.database import crud
+from src.database.db import close_db, init_db
+from src.database.models import User
+
+
+async def measure(fn, user_ids):
+    latencies = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        await fn(user_id)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.median(latencies) * 1e6, latencies[int(len(latencies) * 0.95)] * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    weights = [1 / rank for rank in range(1, args.users + 1)]
+    user_ids = rng.choices(range(1, args.users + 1), weights, k=args.requests)
+
+    with scratch_dir():
+        await init_db()
+        try:
+            for user_id in range(1, args.users + 1):
+                await crud.add_user(User(user_id=user_id, full_name=f"U{user_id}", phone="+7", role="carrier"))
+
+            crud.user_cache.clear()
+            crud.user_cache.hits = crud.user_cache.misses = 0
+            cached = await measure(crud.get_user, user_ids)
+            stats = crud.user_cache.stats()
+            uncached = await measure(crud._load_user, user_ids[:min(len(user_ids), 5000)])
+        finally:
+            await close_db()
+
+    total = stats["hits"] + stats["misses"]
+    print(
+        f"{args.requests} вызовов get_user по {args.users} пользователям: "
+        f"попаданий {stats['hits'] / total:.1%} ({stats['hits']} из {total})"
+    )
+    print(f"get_user с кэшем: медиана {cached[0]:.1f} мкс, p95 {cached[1]:.1f} мкс")
+    print(f"чтение из SQLite: медиана {uncached[0]:.1f} мкс, p95 {uncached[1]:.1f} мкс")
+
+
+if __name__ == "__main__":
+    run(main)
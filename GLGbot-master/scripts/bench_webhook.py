@@ -0,0 +1,147 @@
+"""Пропускная способность приёма апдейтов: webhook против polling.
+
+    python scripts/bench_webhook.py [--updates 2000] [--connections 40] [--latency 0]
+
+Обе схемы кормят один и тот же Dispatcher с настоящими обработчиками
+(/start от незарегистрированных пользователей, ответ уходит в сессию без
+сети). Webhook получает апдейты POST-запросами по localhost, как от Telegram
+с max_connections = --connections. Polling забирает их пачками по 100 через
+getUpdates; --latency добавляет задержку в миллисекундах к каждому ответу
+getUpdates, приближая её к сетевой. Ограничитель исходящих сообщений не
+подключается: меряется приём и обработка, а не лимиты Telegram.
+
+Также проверяется, что запрос с неверным секретом отклоняется.
+"""
+import argparse
+import asyncio
+import collections
+import time
+
+import aiohttp
+from aiogram import Bot, Dispatcher
+from aiogram.methods import GetMe, GetUpdates
+from aiogram.types import User as TelegramUser
+
+from common import FakeSession, message_update, run, scratch_dir
+
+from src.config import WebhookConfig
+from src.database.db import close_db, init_db
+from src.handlers import register_all_handlers
+from src.middlewares.auth import AuthMiddleware
+from src.webhook import SECRET_HEADER, WebhookServer
+
+SECRET = "bench-secret"
+
+
+class PollingSession(FakeSession):
+    """Отдаёт заготовленные апдейты в ответ на getUpdates"""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.pending = collections.deque()
+
+    async def make_request(self, bot, method, timeout=None):
+        if isinstance(method, GetMe):
+            return TelegramUser(id=42, is_bot=True, first_name="Bench")
+        if isinstance(method, GetUpdates):
+            await asyncio.sleep(self.latency)
+            batch = [self.pending.popleft() for _ in range(min(method.limit or 100, len(self.pending)))]
+            if not batch:
+                await asyncio.sleep(0.01)
+            return batch
+        return await super().make_request(bot, method, timeout)
+
+
+class Counter:
+    def __init__(self):
+        self.target = 0
+        self.count = 0
+        self.done = asyncio.Event()
+
+    def reset(self, target: int):
+        self.target, self.count = target, 0
+        self.done.clear()
+
+    async def __call__(self, handler, event, data):
+        try:
+            return await handler(event, data)
+        finally:
+            self.count += 1
+            if self.count >= self.target:
+                self.done.set()
+
+
+async def bench_polling(dp: Dispatcher, bot: Bot, counter: Counter, updates) -> float:
+    session: PollingSession = bot.session
+    session.pending.extend(updates)
+    counter.reset(len(updates))
+
+    started = time.perf_counter()
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, close_bot_session=False))
+    await counter.done.wait()
+    elapsed = time.perf_counter() - started
+
+    await dp.stop_polling()
+    await polling
+    return elapsed
+
+
+async def bench_webhook(dp: Dispatcher, bot: Bot, counter: Counter, updates, connections: int) -> float:
+    settings = WebhookConfig(host="127.0.0.1", port=0, secret_token=SECRET, queue_size=len(updates))
+    server = WebhookServer(dp, bot, settings)
+    await server.start(set_webhook=False)
+    port = server._runner.addresses[0][1]
+    url = f"http://127.0.0.1:{port}{settings.path}"
+    payloads = [update.model_dump(mode="json", exclude_none=True, by_alias=True) for update in updates]
+    counter.reset(len(updates))
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=connections)) as http:
+        async with http.post(url, json=payloads[0], headers={SECRET_HEADER: "wrong"}) as response:
+            rejected = response.status
+
+        async def post(payload):
+            async with http.post(url, json=payload, headers={SECRET_HEADER: SECRET}) as response:
+                return response.status
+
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(post(payload) for payload in payloads))
+        await counter.done.wait()
+        elapsed = time.perf_counter() - started
+
+    await server.stop()
+    print(f"запрос с неверным секретом: HTTP {rejected}; приняты: {collections.Counter(statuses)}")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.0, help="мс на ответ getUpdates")
+    args = parser.parse_args()
+
+    with scratch_dir():
+        await init_db()
+        try:
+            bot = Bot(token="42:TEST", session=PollingSession(args.latency / 1000))
+            dp = Dispatcher()
+            counter = Counter()
+            dp.update.outer_middleware(counter)
+            dp.update.outer_middleware(AuthMiddleware())
+            register_all_handlers(dp, bot)
+
+            updates = [message_update(100_000 + i, "/start") for i in range(args.updates)]
+            polling = await bench_polling(dp, bot, counter, updates)
+            updates = [message_update(200_000 + i, "/start") for i in range(args.updates)]
+            webhook = await bench_webhook(dp, bot, counter, updates, args.connections)
+        finally:
+            await close_db()
+
+    print(f"{args.updates} апдейтов, задержка getUpdates {args.latency:g} мс")
+    print(f"polling: {polling:.2f} с, {args.updates / polling:.0f} апдейтов/с")
+    print(f"webhook: {webhook:.2f} с, {args.updates / webhook:.0f} апдейтов/с ({args.connections} соединений)")
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,240 @@
+"""Два процесса бота на общих Redis и SQLite.
+
+    python scripts/check_multi_instance.py
+
+Поднимает fakeredis по TCP и два процесса бота с FSM в Redis, как при
+горизонтальном масштабировании. Процессы ответвляются (fork) от уже
+импортировавшего aiogram родителя и получают команды через Pipe, так что
+проверка занимает секунды. Проверяет, что:
+
+- мастер регистрации проходит, когда шаги попадают в разные процессы;
+- процесс, видевший пользователя незарегистрированным, узнаёт о регистрации
+  в другом процессе;
+- повторное подтверждение уже зарегистрированного пользователя не падает;
+- уведомления outbox при одновременной выборке двумя процессами уходят
+  ровно по одному разу.
+
+Завершается с кодом 1, если хоть одна проверка не прошла.
+"""
+import asyncio
+import multiprocessing
+import socket
+import sys
+import threading
+from multiprocessing.connection import Connection
+
+from common import FakeSession, callback_update, message_update, quiet, scratch_dir
+
+from src.config import config
+
+NOTIFICATIONS = 60
+REPLY_TIMEOUT = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# --- процесс бота -----------------------------------------------------------
+
+async def serve(conn: Connection, redis_url: str):
+    from aiogram import Bot, Dispatcher
+
+    from src.database.db import close_db, init_db
+    from src.handlers import register_all_handlers
+    from src.middlewares import register_all_middlewares
+    from src.services.outbox import OutboxWorker
+    from src.storage import create_storage
+
+    config.fsm.storage = "redis"
+    config.fsm.redis_url = redis_url
+    config.outbox.batch_size = 5
+
+    await init_db()
+    storage = create_storage()
+    session = FakeSession()
+    bot = Bot(token="42:TEST", session=session)
+    # Блокировка RedisEventIsolation написана на Lua, а fakeredis без пакета
+    # lupa Lua не исполняет; шаги здесь и так идут строго по очереди
+    dp = Dispatcher(storage=storage)
+    register_all_handlers(dp, bot)
+    register_all_middlewares(dp, bot)
+    outbox = OutboxWorker(bot, config.outbox)
+
+    while True:
+        command = await asyncio.to_thread(conn.recv)
+        if command["op"] == "stop":
+            break
+        session.calls.clear()
+
+        texts = []
+        try:
+            if command["op"] == "message":
+                await dp.feed_update(bot, message_update(command["user"], command["text"]))
+            elif command["op"] == "callback":
+                await dp.feed_update(bot, callback_update(command["user"], command["data"]))
+            elif command["op"] == "drain":
+                while await outbox.deliver_due():
+                    pass
+        except Exception as e:
+            # Ошибку обработчика показываем в ответе, а не роняем процесс
+            texts.append(f"{type(e).__name__}: {e}")
+
+        texts.extend(getattr(call, "text", None) for call in session.calls)
+        conn.send([text for text in texts if text])
+
+    await bot.session.close()
+    await storage.close()
+    await close_db()
+
+
+# --- проверка ---------------------------------------------------------------
+
+def run_instance(conn: Connection, redis_url: str):
+    asyncio.run(serve(conn, redis_url))
+
+
+class Instance:
+    def __init__(self, name: str, redis_url: str):
+        self.name = name
+        self.conn, child = multiprocessing.Pipe()
+        # fork, а не spawn: процесс не импортирует aiogram заново
+        self.process = multiprocessing.get_context("fork").Process(
+            target=run_instance, args=(child, redis_url), name=name, daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def send(self, **command):
+        self.conn.send(command)
+
+    def receive(self):
+        try:
+            if self.conn.poll(REPLY_TIMEOUT):
+                return self.conn.recv()
+        except EOFError:
+            pass
+        raise RuntimeError(f"процесс {self.name} не ответил")
+
+    def ask(self, **command):
+        self.send(**command)
+        return self.receive()
+
+    def close(self):
+        # Конец Pipe родителя унаследован и соседним процессом, поэтому
+        # закрытие не даёт EOF: останавливаем командой
+        if self.process.is_alive():
+            self.send(op="stop")
+        self.process.join(30)
+        if self.process.is_alive():
+            self.process.kill()
+
+
+class Checks:
+    def __init__(self):
+        self.failed = 0
+
+    def expect(self, title: str, texts, fragment: str):
+        ok = any(fragment in text for text in texts)
+        self.failed += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {title}" + ("" if ok else f": получено {texts}"))
+
+
+async def prepare_db():
+    from src.database.db import close_db, init_db
+
+    await init_db()
+    await close_db()
+
+
+async def enqueue_notifications(count: int):
+    from src.database import crud
+    from src.database.db import close_db, get_db, init_db
+    from src.database.models import Notification
+
+    await init_db()
+    try:
+        async with get_db().writer() as conn:
+            await crud._insert_notifications(conn, [
+                Notification(chat_id=10_000 + i, text=f"уведомление {i}", dedup_key=f"check:{i}")
+                for i in range(count)
+            ])
+    finally:
+        await close_db()
+
+
+async def register_directly(user_id: int):
+    from src.database import crud
+    from src.database.db import close_db, init_db
+    from src.database.models import User
+
+    await init_db()
+    try:
+        await crud.add_user(User(user_id=user_id, full_name="Direct", phone="+79990000000", role="carrier"))
+    finally:
+        await close_db()
+
+
+def walk_wizard(a: Instance, b: Instance, user_id: int, checks: Checks):
+    checks.expect("A: начало регистрации", a.ask(op="message", user=user_id, text="🚀 Зарегистрироваться"), "Начинаем регистрацию")
+    checks.expect("B: роль", b.ask(op="message", user=user_id, text="📦 Я отправитель"), "Укажите ваше имя")
+    checks.expect("A: имя", a.ask(op="message", user=user_id, text="Иван Петров"), "номер телефона")
+    checks.expect("B: телефон", b.ask(op="message", user=user_id, text="+79991234567"), "email")
+    checks.expect("A: email", a.ask(op="message", user=user_id, text="⏭️ Пропустить"), "компании")
+    checks.expect("B: компания", b.ask(op="message", user=user_id, text="⏭️ Пропустить"), "Проверьте введенные данные")
+
+
+def check():
+    from fakeredis import TcpFakeServer
+
+    port = free_port()
+    redis_url = f"redis://127.0.0.1:{port}/0"
+
+    checks = Checks()
+    asyncio.run(prepare_db())
+    # Процессы ответвляются до запуска потока сервера: fork копирует только
+    # вызывающий поток
+    a, b = Instance("A", redis_url), Instance("B", redis_url)
+    server = TcpFakeServer(("127.0.0.1", port))
+    # Поток сервера фоновый: при выходе из скрипта останавливать его не нужно
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        # A видит пользователя незарегистрированным до начала мастера
+        checks.expect("A: /start до регистрации", a.ask(op="message", user=500, text="/start"), "необходимо пройти регистрацию")
+        walk_wizard(a, b, 500, checks)
+        checks.expect("B: подтверждение", b.ask(op="callback", user=500, data="confirm"), "Вы зарегистрированы")
+        checks.expect("A: /start после регистрации в B", a.ask(op="message", user=500, text="/start"), "Добро пожаловать обратно")
+
+        walk_wizard(a, b, 501, checks)
+        asyncio.run(register_directly(501))
+        checks.expect("A: подтверждение уже зарегистрированного", a.ask(op="callback", user=501, data="confirm"), "уже зарегистрированы")
+
+        asyncio.run(enqueue_notifications(NOTIFICATIONS))
+        a.send(op="drain")
+        b.send(op="drain")
+        sent_a, sent_b = a.receive(), b.receive()
+        sent = sent_a + sent_b
+        ok = len(sent) == NOTIFICATIONS and len(set(sent)) == NOTIFICATIONS
+        checks.failed += not ok
+        print(
+            f"{'OK  ' if ok else 'FAIL'} outbox: {NOTIFICATIONS} уведомлений, "
+            f"отправлено A {len(sent_a)} + B {len(sent_b)}, уникальных {len(set(sent))}"
+        )
+    finally:
+        a.close()
+        b.close()
+
+    if checks.failed:
+        sys.exit(1)
+
+
+def main():
+    quiet()
+    with scratch_dir():
+        check()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Общее для скриптов проверки и замеров из scripts/.
+
+Скрипты запускаются из корня проекта: python scripts/bench_accept.py.
+Каждый работает во временном каталоге со своей базой и не трогает
+database/ и files/ рабочего бота.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Update
+
+
+@contextmanager
+def scratch_dir() -> Iterator[str]:
+    """Временный рабочий каталог: относительные пути config (database, files) ведут в него"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="glgbot-") as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(previous)
+
+
+def quiet():
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+class FakeSession(BaseSession):
+    """Сессия бота без сети: запоминает методы и отвечает правдоподобными объектами"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: List = []
+        self._message_ids = itertools.count(1)
+
+    async def close(self):
+        pass
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls.append(method)
+        name = type(method).__name__
+        if name.startswith("Send") or name.startswith("EditMessage"):
+            from aiogram.types import Message
+            return Message.model_validate({
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": getattr(method, "chat_id", None) or 1, "type": "private"},
+                "text": getattr(method, "text", None) or "",
+            })
+        return True
+
+
+_update_ids = itertools.count(1)
+
+
+def message_update(user_id: int, text: str) -> Update:
+    update_id = next(_update_ids)
+    return Update.model_validate({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"U{user_id}"},
+            "text": text,
+        },
+    })
+
+
+def callback_update(user_id: int, data: str) -> Update:
+    update_id = next(_update_ids)
+    return Update.model_validate({
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "chat_instance": "bench",
+            "data": data,
+            "from": {"id": user_id, "is_bot": False, "first_name": f"U{user_id}"},
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "",
+            },
+        },
+    })
+
+
+def per_call_us(fn: Callable[[], object], n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def per_call_us_async(fn: Callable[[], object], n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        await fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def run(main):
+    quiet()
+    asyncio.run(main())
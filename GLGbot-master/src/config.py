@@ -12,13 +12,94 @@ class BotConfig:
 class DbConfig:
     db_name: str = "bot_database.sqlite"
     db_path: str = "database"
+    read_pool_size: int = 4
+    synchronous: str = "NORMAL"
+    cache_size: int = -16000
+    user_cache_size: int = 10000
+    user_cache_ttl: float = 300.0
+    write_queue_enabled: bool = False
+    write_batch_size: int = 64
+    write_flush_interval: float = 0.005
+    write_queue_size: int = 1024
+
+
+@dataclass
+class FsmConfig:
+    storage: str = "sqlite"  # sqlite | memory | redis
+    flush_interval: float = 1.0
+    idle_ttl: float = 24 * 60 * 60
+    max_contexts: int = 50000
+    redis_url: str = "redis://localhost:6379/0"
+
+
+@dataclass
+class OutboundConfig:
+    global_rate: float = 30.0
+    chat_rate: float = 1.0
+    chat_burst: float = 3.0
+    max_retries: int = 3
+
+
+@dataclass
+class WebhookConfig:
+    enabled: bool = False
+    url: str = ""  # публичный адрес, например https://bot.example.com/webhook
+    path: str = "/webhook"
+    host: str = "0.0.0.0"
+    port: int = 8080
+    secret_token: str = ""  # пусто — случайный секрет на каждый запуск
+    queue_size: int = 1000
+    workers: int = 16
+    drain_timeout: float = 30.0
+
+
+@dataclass
+class MediaConfig:
+    workers: int = 2
+    queue_size: int = 1000
+    image_max_side: int = 2560
+    image_quality: int = 85
+    thumbnail_side: int = 320
+    thumbnail_quality: int = 70
+    pdf_preview_side: int = 1280
+    pdf_preview_quality: int = 80
+    pdf_text_limit: int = 4000
+
+
+@dataclass
+class OutboxConfig:
+    batch_size: int = 50
+    poll_interval: float = 1.0
+    max_attempts: int = 8
+    base_delay: float = 2.0
+    max_delay: float = 10 * 60
+    # Сколько запись остаётся за воркером, забравшим её на отправку
+    claim_timeout: float = 5 * 60
+
+
+@dataclass
+class MonitorConfig:
+    loop_lag_enabled: bool = True
+    loop_lag_threshold: float = 0.1
+    loop_lag_interval: float = 0.05
+    stats_interval: float = 5 * 60  # 0 — не писать статистику в лог
 
 
 @dataclass
 class Config:
     bot: BotConfig = field(default_factory=BotConfig)
     db: DbConfig = field(default_factory=DbConfig)
+    fsm: FsmConfig = field(default_factory=FsmConfig)
+    webhook: WebhookConfig = field(default_factory=WebhookConfig)
+    outbound: OutboundConfig = field(default_factory=OutboundConfig)
+    media: MediaConfig = field(default_factory=MediaConfig)
+    outbox: OutboxConfig = field(default_factory=OutboxConfig)
+    monitor: MonitorConfig = field(default_factory=MonitorConfig)
     files_dir: str = "files"
+    blob_gc_interval: float = 6 * 60 * 60
+    blob_gc_grace: float = 60 * 60
+    subscription_refresh_interval: float = 60.0
+    io_workers: int = 8
 
 
 config = Config()
@@ -1,39 +1,100 @@
-from typing import List, Optional, Dict, Any, Union
+from typing import Callable, Iterable, List, Optional, Dict, Any, Set, Tuple, Union
+import time
 import aiosqlite
 from datetime import datetime
-from sqlalchemy import update
-from src.database.models import Order
-from sqlalchemy import select
 
-from src.database.db import get_db_connection
-from src.database.models import User, Order, Document
+from src.database.db import get_db
+from src.database.cache import LRUCache, MISSING
+from src.database.models import (
+    User,
+    Order,
+    Document,
+    Subscription,
+    Notification,
+    USER_COLUMNS,
+    ORDER_COLUMNS,
+    DOCUMENT_COLUMNS,
+    SUBSCRIPTION_COLUMNS,
+    NOTIFICATION_COLUMNS,
+)
 from src.config import logger
 from src.config import config
 
 
+OrderCursor = Tuple[str, int]
+
+USER_FIELDS = ", ".join(USER_COLUMNS)
+ORDER_FIELDS = ", ".join(ORDER_COLUMNS)
+DOCUMENT_FIELDS = ", ".join(DOCUMENT_COLUMNS)
+SUBSCRIPTION_FIELDS = ", ".join(SUBSCRIPTION_COLUMNS)
+NOTIFICATION_FIELDS = ", ".join(NOTIFICATION_COLUMNS)
+
+# Строит уведомления по записанному заказу: они сохраняются в outbox
+# в той же транзакции, что и сам заказ
+NotificationBuilder = Callable[[Order], List[Notification]]
+
+
+def _to_user(row: tuple) -> User:
+    return User(*row)
+
+
+def _to_order(row: tuple) -> Order:
+    return Order(*row)
+
+
+def _to_document(row: tuple) -> Document:
+    return Document(*row)
+
+
+def _to_subscription(row: tuple) -> Subscription:
+    return Subscription(*row)
+
+
+def _to_notification(row: tuple) -> Notification:
+    return Notification(*row)
+
+user_cache = LRUCache(config.db.user_cache_size, config.db.user_cache_ttl)
+
+AVAILABLE_COUNT_TTL = 30.0
+_available_count: Optional[int] = None
+_available_count_at = 0.0
+
+
+def _invalidate_available_count():
+    global _available_count
+    _available_count = None
+
 
 async def add_user(user: User) -> int:
-    conn = await get_db_connection()
-    try:
-        cursor = await conn.execute(
-            """
-            INSERT INTO users (user_id, username, full_name, phone, email, company, role)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (user.user_id, user.username, user.full_name, user.phone, user.email, user.company, user.role)
-        )
-        await conn.commit()
-        return cursor.lastrowid
-    finally:
-        await conn.close()
+    lastrowid, _ = await get_db().execute_write(
+        """
+        INSERT INTO users (user_id, username, full_name, phone, email, company, role)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (user.user_id, user.username, user.full_name, user.phone, user.email, user.company, user.role)
+    )
+    user_cache.invalidate(user.user_id)
+    return lastrowid
 
 
 async def get_user(user_id: int) -> Optional[User]:
-    conn = await get_db_connection()
-    try:
-        conn.row_factory = aiosqlite.Row
+    user = user_cache.get(user_id)
+    if user is not MISSING:
+        return user
+
+    generation = user_cache.generation
+    user = await _load_user(user_id)
+    # Отсутствие пользователя не кэшируем: он может зарегистрироваться
+    # через другой процесс бота, и этот процесс об этом не узнает
+    if user is not None:
+        user_cache.set(user_id, user, generation)
+    return user
+
+
+async def _load_user(user_id: int) -> Optional[User]:
+    async with get_db().reader() as conn:
         cursor = await conn.execute(
-            "SELECT * FROM users WHERE user_id = ?", 
+            f"SELECT {USER_FIELDS} FROM users WHERE user_id = ?", 
             (user_id,)
         )
         row = await cursor.fetchone()
@@ -41,61 +102,62 @@ async def get_user(user_id: int) -> Optional[User]:
         if not row:
             return None
             
-        return User(
-            user_id=row['user_id'],
-            username=row['username'],
-            full_name=row['full_name'],
-            phone=row['phone'],
-            email=row['email'],
-            company=row['company'],
-            role=row['role'],
-            registration_date=row['registration_date']
-        )
-    finally:
-        await conn.close()
+        return _to_user(row)
 
 
 async def update_user(user: User) -> bool:
-    conn = await get_db_connection()
-    try:
-        await conn.execute(
-            """
-            UPDATE users
-            SET username = ?, full_name = ?, phone = ?, email = ?, company = ?, role = ?
-            WHERE user_id = ?
-            """,
-            (user.username, user.full_name, user.phone, user.email, user.company, user.role, user.user_id)
-        )
-        await conn.commit()
-        return True
-    finally:
-        await conn.close()
+    await get_db().execute_write(
+        """
+        UPDATE users
+        SET username = ?, full_name = ?, phone = ?, email = ?, company = ?, role = ?
+        WHERE user_id = ?
+        """,
+        (user.username, user.full_name, user.phone, user.email, user.company, user.role, user.user_id)
+    )
+    user_cache.invalidate(user.user_id)
+    return True
 
 
-async def add_order(order: Order) -> int:
-    conn = await get_db_connection()
-    try:
-        cursor = await conn.execute(
-            """
-            INSERT INTO orders (sender_id, cargo_type, weight, dimensions, pickup_address, 
-                              delivery_address, pickup_date, comment, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (order.sender_id, order.cargo_type, order.weight, order.dimensions, order.pickup_address,
-             order.delivery_address, order.pickup_date, order.comment, order.status)
-        )
-        await conn.commit()
-        return cursor.lastrowid
-    finally:
-        await conn.close()
+async def _insert_notifications(conn: aiosqlite.Connection, notifications: List[Notification]):
+    # Повтор с тем же dedup_key (двойное нажатие, повторный апдейт) игнорируется
+    await conn.executemany(
+        """
+        INSERT OR IGNORE INTO outbox (chat_id, text, dedup_key, reply_markup, next_attempt_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (n.chat_id, n.text, n.dedup_key, n.reply_markup, n.next_attempt_at or time.time())
+            for n in notifications
+        ]
+    )
+
+
+async def add_order(order: Order, notifications: Optional[NotificationBuilder] = None) -> int:
+    sql = """
+        INSERT INTO orders (sender_id, cargo_type, weight, dimensions, pickup_address, 
+                          delivery_address, pickup_date, comment, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+    params = (order.sender_id, order.cargo_type, order.weight, order.dimensions, order.pickup_address,
+              order.delivery_address, order.pickup_date, order.comment, order.status)
+
+    if notifications is None:
+        lastrowid, _ = await get_db().execute_write(sql, params)
+    else:
+        async with get_db().writer() as conn:
+            cursor = await conn.execute(sql, params)
+            lastrowid = cursor.lastrowid
+            order.order_id = lastrowid
+            await _insert_notifications(conn, notifications(order))
+
+    _invalidate_available_count()
+    return lastrowid
 
 
 async def get_order(order_id: int) -> Optional[Order]:
-    conn = await get_db_connection()
-    try:
-        conn.row_factory = aiosqlite.Row
+    async with get_db().reader() as conn:
         cursor = await conn.execute(
-            "SELECT * FROM orders WHERE order_id = ?", 
+            f"SELECT {ORDER_FIELDS} FROM orders WHERE order_id = ?", 
             (order_id,)
         )
         row = await cursor.fetchone()
@@ -103,176 +165,491 @@ async def get_order(order_id: int) -> Optional[Order]:
         if not row:
             return None
             
-        return Order(
-            order_id=row['order_id'],
-            sender_id=row['sender_id'],
-            carrier_id=row['carrier_id'],
-            cargo_type=row['cargo_type'],
-            weight=row['weight'],
-            dimensions=row['dimensions'],
-            pickup_address=row['pickup_address'],
-            delivery_address=row['delivery_address'],
-            pickup_date=row['pickup_date'],
-            comment=row['comment'],
-            status=row['status'],
-            creation_date=row['creation_date']
-        )
-    finally:
-        await conn.close()
+        return _to_order(row)
 
 
 async def update_order(order: Order) -> bool:
-    conn = await get_db_connection()
-    try:
-        await conn.execute(
-            """
+    await get_db().execute_write(
+        """
+        UPDATE orders
+        SET carrier_id = ?, cargo_type = ?, weight = ?, dimensions = ?, 
+            pickup_address = ?, delivery_address = ?, pickup_date = ?, 
+            comment = ?, status = ?
+        WHERE order_id = ?
+        """,
+        (order.carrier_id, order.cargo_type, order.weight, order.dimensions,
+         order.pickup_address, order.delivery_address, order.pickup_date,
+         order.comment, order.status, order.order_id)
+    )
+    _invalidate_available_count()
+    return True
+
+
+async def accept_order_atomic(
+    order_id: int,
+    carrier_id: int,
+    notifications: Optional[NotificationBuilder] = None
+) -> Optional[Order]:
+    """Переводит заказ из 'new' в 'accepted' одним условным UPDATE.
+
+    Возвращает обновлённый заказ или None, если заказ не найден или его уже
+    принял другой перевозчик.
+    """
+    # Уже принятый заказ отклоняем чтением, не вставая в очередь к писателю
+    async with get_db().reader() as conn:
+        cursor = await conn.execute("SELECT status FROM orders WHERE order_id = ?", (order_id,))
+        row = await cursor.fetchone()
+    if not row or row[0] != "new":
+        return None
+
+    async with get_db().writer() as conn:
+        rows = await conn.execute_fetchall(
+            f"""
             UPDATE orders
-            SET carrier_id = ?, cargo_type = ?, weight = ?, dimensions = ?, 
-                pickup_address = ?, delivery_address = ?, pickup_date = ?, 
-                comment = ?, status = ?
-            WHERE order_id = ?
+            SET carrier_id = ?, status = 'accepted'
+            WHERE order_id = ? AND status = 'new'
+            RETURNING {ORDER_FIELDS}
             """,
-            (order.carrier_id, order.cargo_type, order.weight, order.dimensions,
-             order.pickup_address, order.delivery_address, order.pickup_date,
-             order.comment, order.status, order.order_id)
+            (carrier_id, order_id)
         )
-        await conn.commit()
-        return True
-    finally:
-        await conn.close()
+        if rows and notifications is not None:
+            await _insert_notifications(conn, notifications(_to_order(rows[0])))
 
+    if not rows:
+        return None
 
-async def get_available_orders() -> List[Order]:
-    conn = await get_db_connection()
-    try:
-        conn.row_factory = aiosqlite.Row
+    _invalidate_available_count()
+    return _to_order(rows[0])
+
+
+async def change_order_status(
+    order_id: int,
+    expected_status: str,
+    new_status: str,
+    notifications: Optional[NotificationBuilder] = None
+) -> Optional[Order]:
+    """Условный переход статуса; None, если заказа нет или статус уже другой"""
+    async with get_db().writer() as conn:
         cursor = await conn.execute(
-            "SELECT * FROM orders WHERE status = 'new' ORDER BY creation_date DESC"
+            f"""
+            UPDATE orders SET status = ?
+            WHERE order_id = ? AND status = ?
+            RETURNING {ORDER_FIELDS}
+            """,
+            (new_status, order_id, expected_status)
         )
         rows = await cursor.fetchall()
-        
-        return [
-            Order(
-                order_id=row['order_id'],
-                sender_id=row['sender_id'],
-                carrier_id=row['carrier_id'],
-                cargo_type=row['cargo_type'],
-                weight=row['weight'],
-                dimensions=row['dimensions'],
-                pickup_address=row['pickup_address'],
-                delivery_address=row['delivery_address'],
-                pickup_date=row['pickup_date'],
-                comment=row['comment'],
-                status=row['status'],
-                creation_date=row['creation_date']
-            ) for row in rows
-        ]
-    finally:
-        await conn.close()
+        if rows and notifications is not None:
+            await _insert_notifications(conn, notifications(_to_order(rows[0])))
 
+    if not rows:
+        return None
 
-async def get_user_orders(user_id: int, role: str) -> List[Order]:
-    conn = await get_db_connection()
-    try:
-        conn.row_factory = aiosqlite.Row
-        
-        if role == "sender":
+    _invalidate_available_count()
+    return _to_order(rows[0])
+
+async def get_available_orders_page(
+    limit: int,
+    before: Optional[OrderCursor] = None,
+    after: Optional[OrderCursor] = None
+) -> List[Order]:
+    """Страница новых заказов по курсору (creation_date, order_id), от новых к старым.
+
+    before - заказы старше курсора (следующая страница),
+    after - заказы новее курсора (предыдущая страница).
+    """
+    async with get_db().reader() as conn:
+        if before is not None:
             cursor = await conn.execute(
-                "SELECT * FROM orders WHERE sender_id = ? ORDER BY creation_date DESC", 
-                (user_id,)
+                f"""
+                SELECT {ORDER_FIELDS} FROM orders
+                WHERE status = 'new' AND (creation_date, order_id) < (?, ?)
+                ORDER BY creation_date DESC, order_id DESC
+                LIMIT ?
+                """,
+                (before[0], before[1], limit)
+            )
+        elif after is not None:
+            cursor = await conn.execute(
+                f"""
+                SELECT {ORDER_FIELDS} FROM orders
+                WHERE status = 'new' AND (creation_date, order_id) > (?, ?)
+                ORDER BY creation_date ASC, order_id ASC
+                LIMIT ?
+                """,
+                (after[0], after[1], limit)
             )
         else:
             cursor = await conn.execute(
-                "SELECT * FROM orders WHERE carrier_id = ? ORDER BY creation_date DESC", 
-                (user_id,)
+                f"""
+                SELECT {ORDER_FIELDS} FROM orders
+                WHERE status = 'new'
+                ORDER BY creation_date DESC, order_id DESC
+                LIMIT ?
+                """,
+                (limit,)
             )
-            
+
+        rows = await cursor.fetchall()
+        if after is not None:
+            rows = list(reversed(rows))
+
+        return [_to_order(row) for row in rows]
+
+
+async def count_available_orders() -> int:
+    global _available_count, _available_count_at
+
+    now = time.monotonic()
+    if _available_count is not None and now - _available_count_at < AVAILABLE_COUNT_TTL:
+        return _available_count
+
+    async with get_db().reader() as conn:
+        cursor = await conn.execute("SELECT COUNT(*) FROM orders WHERE status = 'new'")
+        row = await cursor.fetchone()
+
+    _available_count = row[0]
+    _available_count_at = now
+    return _available_count
+
+
+ORDER_STATUSES = ("new", "accepted", "in_progress", "completed", "cancelled")
+
+
+def _owner_column(role: str) -> str:
+    return "sender_id" if role == "sender" else "carrier_id"
+
+
+async def count_user_orders_by_status(user_id: int, role: str) -> Dict[str, int]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(
+            f"SELECT status, COUNT(*) FROM orders WHERE {_owner_column(role)} = ? GROUP BY status",
+            (user_id,)
+        )
+        rows = await cursor.fetchall()
+
+    rank = {status: i for i, status in enumerate(ORDER_STATUSES)}
+    return dict(sorted(rows, key=lambda row: rank.get(row[0], len(rank))))
+
+
+async def get_user_orders_page(
+    user_id: int,
+    role: str,
+    status: str,
+    limit: int,
+    offset: int = 0
+) -> List[Order]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(
+            f"""
+            SELECT {ORDER_FIELDS} FROM orders
+            WHERE {_owner_column(role)} = ? AND status = ?
+            ORDER BY creation_date DESC, order_id DESC
+            LIMIT ? OFFSET ?
+            """,
+            (user_id, status, limit, offset)
+        )
         rows = await cursor.fetchall()
-        
-        return [
-            Order(
-                order_id=row['order_id'],
-                sender_id=row['sender_id'],
-                carrier_id=row['carrier_id'],
-                cargo_type=row['cargo_type'],
-                weight=row['weight'],
-                dimensions=row['dimensions'],
-                pickup_address=row['pickup_address'],
-                delivery_address=row['delivery_address'],
-                pickup_date=row['pickup_date'],
-                comment=row['comment'],
-                status=row['status'],
-                creation_date=row['creation_date']
-            ) for row in rows
-        ]
-    finally:
-        await conn.close()
+
+    return [_to_order(row) for row in rows]
 
 
 async def add_document(document: Document) -> int:
-    conn = await get_db_connection()
-    try:
+    lastrowid, _ = await get_db().execute_write(
+        """
+        INSERT INTO documents (
+            order_id, file_path, file_name, file_type, file_id, file_unique_id, content_hash
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            document.order_id, document.file_path, document.file_name, document.file_type,
+            document.file_id, document.file_unique_id, document.content_hash
+        )
+    )
+    return lastrowid
+
+
+async def set_document_file_id(doc_id: int, file_id: Optional[str], file_unique_id: Optional[str] = None):
+    """Запоминает file_id Telegram; None сбрасывает его, и файл снова уйдёт с диска"""
+    await get_db().execute_write(
+        "UPDATE documents SET file_id = ?, file_unique_id = ? WHERE doc_id = ?",
+        (file_id, file_unique_id, doc_id)
+    )
+
+
+async def get_referenced_blob_paths() -> Set[str]:
+    async with get_db().reader() as conn:
         cursor = await conn.execute(
             """
-            INSERT INTO documents (order_id, file_path, file_name, file_type)
-            VALUES (?, ?, ?, ?)
+            SELECT file_path, normalized_path, thumbnail_path, preview_path
+            FROM documents WHERE content_hash IS NOT NULL
+            """
+        )
+        rows = await cursor.fetchall()
+
+    return {path for row in rows for path in row if path}
+
+
+async def get_document(doc_id: int) -> Optional[Document]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(
+            f"SELECT {DOCUMENT_FIELDS} FROM documents WHERE doc_id = ?",
+            (doc_id,)
+        )
+        row = await cursor.fetchone()
+
+    return _to_document(row) if row else None
+
+
+async def get_unprocessed_document_ids(limit: int) -> List[int]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(
+            "SELECT doc_id FROM documents WHERE processed_at IS NULL ORDER BY doc_id LIMIT ?",
+            (limit,)
+        )
+        rows = await cursor.fetchall()
+
+    return [row[0] for row in rows]
+
+
+async def mark_document_processed(doc_id: int):
+    await get_db().execute_write(
+        "UPDATE documents SET processed_at = CURRENT_TIMESTAMP WHERE doc_id = ?",
+        (doc_id,)
+    )
+
+
+async def set_document_image(
+    doc_id: int,
+    width: int,
+    height: int,
+    normalized_path: str,
+    thumbnail_path: str
+):
+    # file_id не трогаем: изображение, загруженное файлом, отправляется
+    # оригиналом, а сжатая копия нужна только фотографиям
+    await get_db().execute_write(
+        """
+        UPDATE documents
+        SET width = ?, height = ?, normalized_path = ?, thumbnail_path = ?,
+            processed_at = CURRENT_TIMESTAMP
+        WHERE doc_id = ?
+        """,
+        (width, height, normalized_path, thumbnail_path, doc_id)
+    )
+
+
+async def set_document_pdf(
+    doc_id: int,
+    page_count: int,
+    first_page_text: str,
+    preview_path: str,
+    thumbnail_path: str
+):
+    await get_db().execute_write(
+        """
+        UPDATE documents
+        SET page_count = ?, first_page_text = ?, preview_path = ?, thumbnail_path = ?,
+            processed_at = CURRENT_TIMESTAMP
+        WHERE doc_id = ?
+        """,
+        (page_count, first_page_text, preview_path, thumbnail_path, doc_id)
+    )
+
+
+async def set_document_thumbnail_file_id(doc_id: int, file_id: Optional[str]):
+    await get_db().execute_write(
+        "UPDATE documents SET thumbnail_file_id = ? WHERE doc_id = ?",
+        (file_id, doc_id)
+    )
+
+
+async def set_document_preview_file_id(doc_id: int, file_id: Optional[str]):
+    await get_db().execute_write(
+        "UPDATE documents SET preview_file_id = ? WHERE doc_id = ?",
+        (file_id, doc_id)
+    )
+
+
+async def get_order_thumbnail(order_id: int) -> Optional[Document]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(
+            f"""
+            SELECT {DOCUMENT_FIELDS} FROM documents
+            WHERE order_id = ? AND thumbnail_path IS NOT NULL
+            ORDER BY doc_id LIMIT 1
             """,
-            (document.order_id, document.file_path, document.file_name, document.file_type)
+            (order_id,)
         )
-        await conn.commit()
-        return cursor.lastrowid
-    finally:
-        await conn.close()
+        row = await cursor.fetchone()
+
+    return _to_document(row) if row else None
 
 
 async def get_order_documents(order_id: int) -> List[Document]:
-    conn = await get_db_connection()
-    try:
-        conn.row_factory = aiosqlite.Row
+    async with get_db().reader() as conn:
         cursor = await conn.execute(
-            "SELECT * FROM documents WHERE order_id = ?", 
+            f"SELECT {DOCUMENT_FIELDS} FROM documents WHERE order_id = ?", 
             (order_id,)
         )
         rows = await cursor.fetchall()
         
-        return [
-            Document(
-                doc_id=row['doc_id'],
-                order_id=row['order_id'],
-                file_path=row['file_path'],
-                file_name=row['file_name'],
-                file_type=row['file_type'],
-                upload_date=row['upload_date']
-            ) for row in rows
-        ]
-    finally:
-        await conn.close()
+        return [_to_document(row) for row in rows]
         
 async def update_user_field(user_id: int, field: str, value: str):
-    db_path = "database/bot_database.sqlite"  # Путь к твоей базе
-    query = f"UPDATE Users SET {field} = ? WHERE user_id = ?"
+    query = f"UPDATE users SET {field} = ? WHERE user_id = ?"
 
-    async with aiosqlite.connect(db_path) as db:
-        await db.execute(query, (value, user_id))
-        await db.commit()
+    await get_db().execute_write(query, (value, user_id))
+    user_cache.invalidate(user_id)
         
 
 
 async def update_order_status(order_id: int, new_status: str):
-    async with aiosqlite.connect("database/bot_database.sqlite") as db:
-        await db.execute(
-            "UPDATE orders SET status = ? WHERE id = ?",
-            (new_status, order_id)
+    await get_db().execute_write(
+        "UPDATE orders SET status = ? WHERE order_id = ?",
+        (new_status, order_id)
+    )
+    _invalidate_available_count()
+
+
+
+async def add_subscription(subscription: Subscription) -> int:
+    lastrowid, _ = await get_db().execute_write(
+        """
+        INSERT INTO subscriptions (
+            carrier_id, cargo_type, min_weight, max_weight,
+            pickup_city, delivery_city, date_from, date_to
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            subscription.carrier_id, subscription.cargo_type,
+            subscription.min_weight, subscription.max_weight,
+            subscription.pickup_city, subscription.delivery_city,
+            subscription.date_from, subscription.date_to
         )
-        await db.commit()
+    )
+    return lastrowid
+
+
+async def delete_subscription(sub_id: int, carrier_id: int) -> bool:
+    _, rowcount = await get_db().execute_write(
+        "DELETE FROM subscriptions WHERE sub_id = ? AND carrier_id = ?",
+        (sub_id, carrier_id)
+    )
+    return rowcount > 0
+
+
+async def get_carrier_subscriptions(carrier_id: int) -> List[Subscription]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(
+            f"SELECT {SUBSCRIPTION_FIELDS} FROM subscriptions WHERE carrier_id = ? ORDER BY sub_id",
+            (carrier_id,)
+        )
+        rows = await cursor.fetchall()
+
+    return [_to_subscription(row) for row in rows]
+
+
+async def get_all_subscriptions() -> List[Subscription]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(f"SELECT {SUBSCRIPTION_FIELDS} FROM subscriptions")
+        rows = await cursor.fetchall()
+
+    return [_to_subscription(row) for row in rows]
+
+
+async def get_subscription_ids() -> Set[int]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute("SELECT sub_id FROM subscriptions")
+        rows = await cursor.fetchall()
+
+    return {row[0] for row in rows}
+
+
+async def get_subscriptions_by_ids(sub_ids: Iterable[int]) -> List[Subscription]:
+    sub_ids = list(sub_ids)
+    rows = []
+    async with get_db().reader() as conn:
+        # Параметров в одном запросе SQLite допускает ограниченное число
+        for i in range(0, len(sub_ids), 500):
+            chunk = sub_ids[i:i + 500]
+            cursor = await conn.execute(
+                f"SELECT {SUBSCRIPTION_FIELDS} FROM subscriptions "
+                f"WHERE sub_id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            )
+            rows.extend(await cursor.fetchall())
+
+    return [_to_subscription(row) for row in rows]
+
+
+async def claim_due_notifications(worker_id: str, now: float, limit: int, lease: float) -> List[Notification]:
+    """Забирает готовые к отправке уведомления за воркером на lease секунд.
+
+    Выборка и захват — один UPDATE, поэтому несколько процессов бота не
+    получат одну и ту же запись. Если воркер упал, не отправив уведомление,
+    после истечения claimed_until его заберёт другой.
+    """
+    async with get_db().writer() as conn:
+        cursor = await conn.execute(
+            f"""
+            UPDATE outbox SET claimed_by = ?, claimed_until = ?
+            WHERE notification_id IN (
+                SELECT notification_id FROM outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                  AND (claimed_until IS NULL OR claimed_until <= ?)
+                ORDER BY next_attempt_at
+                LIMIT ?
+            )
+            RETURNING {NOTIFICATION_FIELDS}
+            """,
+            (worker_id, now + lease, now, now, limit)
+        )
+        rows = await cursor.fetchall()
+
+    notifications = [_to_notification(row) for row in rows]
+    notifications.sort(key=lambda n: n.next_attempt_at)
+    return notifications
+
+
+async def get_next_notification_time() -> Optional[float]:
+    async with get_db().reader() as conn:
+        cursor = await conn.execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+        )
+        row = await cursor.fetchone()
+
+    return row[0]
+
+
+async def mark_notification_sent(notification_id: int, attempts: int):
+    await get_db().execute_write(
+        """
+        UPDATE outbox SET status = 'sent', attempts = ?, sent_at = CURRENT_TIMESTAMP
+        WHERE notification_id = ?
+        """,
+        (attempts, notification_id)
+    )
 
 
+async def reschedule_notification(notification_id: int, attempts: int, next_attempt_at: float, error: str):
+    await get_db().execute_write(
+        """
+        UPDATE outbox
+        SET attempts = ?, next_attempt_at = ?, last_error = ?, claimed_by = NULL, claimed_until = NULL
+        WHERE notification_id = ?
+        """,
+        (attempts, next_attempt_at, error, notification_id)
+    )
 
-async def get_order_by_id(order_id: int):
-    db_path = "database/bot_database.sqlite"
-    query = "SELECT * FROM Orders WHERE id = ?"
 
-    async with aiosqlite.connect(db_path) as db:
-        async with db.execute(query, (order_id,)) as cursor:
-            row = await cursor.fetchone()
-            return row  # можно будет потом замапить в модель
\ No newline at end of file
+async def mark_notification_failed(notification_id: int, attempts: int, error: str):
+    await get_db().execute_write(
+        """
+        UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?
+        WHERE notification_id = ?
+        """,
+        (attempts, error, notification_id)
+    )
@@ -1,67 +1,125 @@
+import asyncio
 import os
 import sqlite3
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Sequence, Tuple
+
 import aiosqlite
 from src.config import config, logger
+from src.database.migrations import apply_migrations
+from src.database.write_queue import WriteQueue
 
 
 DB_PATH = os.path.join(config.db.db_path, config.db.db_name)
 
 
+class Database:
+    """Долгоживущие соединения: пул читателей и один писатель под блокировкой."""
+
+    def __init__(self, path: str, read_pool_size: int):
+        self.path = path
+        self.read_pool_size = read_pool_size
+        self._readers: asyncio.Queue = asyncio.Queue(maxsize=read_pool_size)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self.write_queue: Optional[WriteQueue] = None
+
+    async def _open(self) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.path)
+        await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute(f"PRAGMA synchronous = {config.db.synchronous}")
+        await conn.execute(f"PRAGMA cache_size = {int(config.db.cache_size)}")
+        return conn
+
+    async def connect(self):
+        self._writer = await self._open()
+        for _ in range(self.read_pool_size):
+            self._readers.put_nowait(await self._open())
+
+        if config.db.write_queue_enabled:
+            self.write_queue = WriteQueue(
+                self,
+                config.db.write_batch_size,
+                config.db.write_flush_interval,
+                config.db.write_queue_size,
+            )
+            self.write_queue.start()
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            await self._writer.commit()
+
+    async def execute_write(self, sql: str, params: Sequence[Any] = ()) -> Tuple[int, int]:
+        """Одиночная запись; возвращает (lastrowid, rowcount).
+
+        При включённой очереди записи запрос уходит в групповую фиксацию.
+        """
+        if self.write_queue is not None:
+            return await self.write_queue.submit(sql, params)
+
+        async with self.writer() as conn:
+            cursor = await conn.execute(sql, params)
+            return cursor.lastrowid, cursor.rowcount
+
+    async def close(self):
+        if self.write_queue is not None:
+            await self.write_queue.stop()
+            self.write_queue = None
+
+        async with self._write_lock:
+            if self._writer is not None:
+                await self._writer.close()
+                self._writer = None
+        for _ in range(self.read_pool_size):
+            conn = await self._readers.get()
+            await conn.close()
+
+
+_database: Optional[Database] = None
+
+
 async def init_db():
+    global _database
+
     os.makedirs(config.db.db_path, exist_ok=True)
     
     conn = await aiosqlite.connect(DB_PATH)
     try:
-        await conn.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY,
-            username TEXT,
-            full_name TEXT NOT NULL,
-            phone TEXT NOT NULL,
-            email TEXT,
-            company TEXT,
-            role TEXT NOT NULL,
-            registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        await conn.execute('''
-        CREATE TABLE IF NOT EXISTS orders (
-            order_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            sender_id INTEGER NOT NULL,
-            carrier_id INTEGER,
-            cargo_type TEXT NOT NULL,
-            weight REAL NOT NULL,
-            dimensions TEXT,
-            pickup_address TEXT NOT NULL,
-            delivery_address TEXT NOT NULL,
-            pickup_date TEXT NOT NULL,
-            comment TEXT,
-            status TEXT NOT NULL DEFAULT 'new',
-            creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (sender_id) REFERENCES users (user_id),
-            FOREIGN KEY (carrier_id) REFERENCES users (user_id)
-        )
-        ''')
-        
-        await conn.execute('''
-        CREATE TABLE IF NOT EXISTS documents (
-            doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            order_id INTEGER NOT NULL,
-            file_path TEXT NOT NULL,
-            file_name TEXT NOT NULL,
-            file_type TEXT NOT NULL,
-            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (order_id) REFERENCES orders (order_id)
-        )
-        ''')
-        
-        await conn.commit()
+        version = await apply_migrations(conn)
     finally:
         await conn.close()
+
+    if _database is None:
+        _database = Database(DB_PATH, config.db.read_pool_size)
+        await _database.connect()
     
-    logger.info("База данных инициализирована")
+    logger.info(f"База данных инициализирована, версия схемы {version}")
+
+
+async def close_db():
+    global _database
+
+    if _database is not None:
+        await _database.close()
+        _database = None
+        logger.info("Соединения с базой данных закрыты")
 
 
-async def get_db_connection():
-    return await aiosqlite.connect(DB_PATH)
+def get_db() -> Database:
+    if _database is None:
+        raise RuntimeError("База данных не инициализирована, вызовите init_db()")
+    return _database
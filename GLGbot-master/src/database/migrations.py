@@ -0,0 +1,178 @@
+from typing import List, Tuple
+
+import aiosqlite
+
+from src.config import logger
+
+
+# Номер миграции совпадает с PRAGMA user_version после её применения.
+# Новые миграции добавляются только в конец списка.
+MIGRATIONS: List[Tuple[int, str]] = [
+    (1, '''
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        username TEXT,
+        full_name TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        email TEXT,
+        company TEXT,
+        role TEXT NOT NULL,
+        registration_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS orders (
+        order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sender_id INTEGER NOT NULL,
+        carrier_id INTEGER,
+        cargo_type TEXT NOT NULL,
+        weight REAL NOT NULL,
+        dimensions TEXT,
+        pickup_address TEXT NOT NULL,
+        delivery_address TEXT NOT NULL,
+        pickup_date TEXT NOT NULL,
+        comment TEXT,
+        status TEXT NOT NULL DEFAULT 'new',
+        creation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (sender_id) REFERENCES users (user_id),
+        FOREIGN KEY (carrier_id) REFERENCES users (user_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS documents (
+        doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id INTEGER NOT NULL,
+        file_path TEXT NOT NULL,
+        file_name TEXT NOT NULL,
+        file_type TEXT NOT NULL,
+        upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (order_id) REFERENCES orders (order_id)
+    );
+    '''),
+    (2, '''
+    CREATE INDEX IF NOT EXISTS idx_orders_status_created
+        ON orders (status, creation_date DESC);
+    CREATE INDEX IF NOT EXISTS idx_orders_sender_created
+        ON orders (sender_id, creation_date DESC);
+    CREATE INDEX IF NOT EXISTS idx_orders_carrier_created
+        ON orders (carrier_id, creation_date DESC);
+    '''),
+    (3, '''
+    CREATE INDEX IF NOT EXISTS idx_documents_order
+        ON documents (order_id);
+    '''),
+    (4, '''
+    DROP INDEX IF EXISTS idx_orders_status_created;
+    CREATE INDEX IF NOT EXISTS idx_orders_status_created_id
+        ON orders (status, creation_date DESC, order_id DESC);
+    '''),
+    (5, '''
+    CREATE TABLE IF NOT EXISTS fsm_storage (
+        storage_key TEXT PRIMARY KEY,
+        state TEXT,
+        data TEXT NOT NULL DEFAULT '{}',
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    '''),
+    (6, '''
+    CREATE INDEX IF NOT EXISTS idx_orders_sender_status_created
+        ON orders (sender_id, status, creation_date DESC, order_id DESC);
+    CREATE INDEX IF NOT EXISTS idx_orders_carrier_status_created
+        ON orders (carrier_id, status, creation_date DESC, order_id DESC);
+    '''),
+    (7, '''
+    ALTER TABLE documents ADD COLUMN file_id TEXT;
+    ALTER TABLE documents ADD COLUMN file_unique_id TEXT;
+    '''),
+    (8, '''
+    ALTER TABLE documents ADD COLUMN content_hash TEXT;
+    CREATE INDEX IF NOT EXISTS idx_documents_content_hash
+        ON documents (content_hash);
+    '''),
+    (9, '''
+    ALTER TABLE documents ADD COLUMN width INTEGER;
+    ALTER TABLE documents ADD COLUMN height INTEGER;
+    ALTER TABLE documents ADD COLUMN normalized_path TEXT;
+    ALTER TABLE documents ADD COLUMN thumbnail_path TEXT;
+    ALTER TABLE documents ADD COLUMN thumbnail_file_id TEXT;
+    ALTER TABLE documents ADD COLUMN processed_at TIMESTAMP;
+    CREATE INDEX IF NOT EXISTS idx_documents_unprocessed
+        ON documents (doc_id) WHERE processed_at IS NULL;
+    '''),
+    (10, '''
+    ALTER TABLE documents ADD COLUMN page_count INTEGER;
+    ALTER TABLE documents ADD COLUMN first_page_text TEXT;
+    '''),
+    (11, '''
+    CREATE TABLE IF NOT EXISTS subscriptions (
+        sub_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        carrier_id INTEGER NOT NULL,
+        cargo_type TEXT,
+        min_weight REAL,
+        max_weight REAL,
+        pickup_city TEXT,
+        delivery_city TEXT,
+        date_from TEXT,
+        date_to TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (carrier_id) REFERENCES users (user_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_subscriptions_carrier
+        ON subscriptions (carrier_id);
+    '''),
+    (12, '''
+    CREATE TABLE IF NOT EXISTS outbox (
+        notification_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chat_id INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        dedup_key TEXT NOT NULL UNIQUE,
+        reply_markup TEXT,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sent_at TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_outbox_pending
+        ON outbox (next_attempt_at) WHERE status = 'pending';
+    '''),
+    (13, '''
+    ALTER TABLE outbox ADD COLUMN claimed_by TEXT;
+    ALTER TABLE outbox ADD COLUMN claimed_until REAL;
+    '''),
+    (14, '''
+    ALTER TABLE documents ADD COLUMN preview_path TEXT;
+    ALTER TABLE documents ADD COLUMN preview_file_id TEXT;
+    -- У PDF в thumbnail_path лежало превью страницы: переносим его и
+    -- отправляем документ на повторную обработку за настоящей миниатюрой
+    UPDATE documents
+    SET preview_path = thumbnail_path, preview_file_id = thumbnail_file_id,
+        thumbnail_path = NULL, thumbnail_file_id = NULL, processed_at = NULL
+    WHERE page_count IS NOT NULL AND thumbnail_path IS NOT NULL;
+    '''),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+async def get_schema_version(conn: aiosqlite.Connection) -> int:
+    cursor = await conn.execute("PRAGMA user_version")
+    row = await cursor.fetchone()
+    return row[0]
+
+
+async def apply_migrations(conn: aiosqlite.Connection) -> int:
+    current = await get_schema_version(conn)
+    if current >= SCHEMA_VERSION:
+        return current
+
+    for version, script in MIGRATIONS:
+        if version <= current:
+            continue
+
+        # Каждая миграция применяется в своей транзакции вместе с номером версии
+        await conn.executescript(
+            f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;"
+        )
+        logger.info(f"Применена миграция схемы БД #{version}")
+
+    return SCHEMA_VERSION
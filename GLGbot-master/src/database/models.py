@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 from typing import Optional, List
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     user_id: int
     full_name: str
@@ -15,7 +15,7 @@ class User:
     registration_date: datetime = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Order:
     sender_id: int
     cargo_type: str
@@ -31,7 +31,7 @@ class Order:
     creation_date: datetime = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     order_id: int
     file_path: str
@@ -39,3 +39,55 @@ class Document:
     file_type: str
     doc_id: Optional[int] = None
     upload_date: datetime = None
+    file_id: Optional[str] = None
+    file_unique_id: Optional[str] = None
+    content_hash: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    normalized_path: Optional[str] = None
+    thumbnail_path: Optional[str] = None
+    thumbnail_file_id: Optional[str] = None
+    processed_at: datetime = None
+    page_count: Optional[int] = None
+    first_page_text: Optional[str] = None
+    preview_path: Optional[str] = None
+    preview_file_id: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Subscription:
+    carrier_id: int
+    cargo_type: Optional[str] = None
+    min_weight: Optional[float] = None
+    max_weight: Optional[float] = None
+    pickup_city: Optional[str] = None
+    delivery_city: Optional[str] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    sub_id: Optional[int] = None
+    created_at: datetime = None
+
+
+@dataclass(slots=True)
+class Notification:
+    chat_id: int
+    text: str
+    dedup_key: str
+    reply_markup: Optional[str] = None
+    notification_id: Optional[int] = None
+    status: str = "pending"
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    last_error: Optional[str] = None
+    created_at: datetime = None
+    sent_at: datetime = None
+    claimed_by: Optional[str] = None
+    claimed_until: Optional[float] = None
+
+
+# Колонки в порядке полей моделей: строка SELECT раскладывается в модель позиционно
+USER_COLUMNS = tuple(f.name for f in fields(User))
+ORDER_COLUMNS = tuple(f.name for f in fields(Order))
+DOCUMENT_COLUMNS = tuple(f.name for f in fields(Document))
+SUBSCRIPTION_COLUMNS = tuple(f.name for f in fields(Subscription))
+NOTIFICATION_COLUMNS = tuple(f.name for f in fields(Notification))
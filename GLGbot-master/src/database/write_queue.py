@@ -0,0 +1,121 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from src.config import logger
+
+if TYPE_CHECKING:
+    from src.database.db import Database
+
+
+WriteResult = Tuple[int, int]
+
+
+class WriteQueue:
+    """Групповая фиксация записей: один писатель, одна транзакция на пачку.
+
+    Вызывающий код ставит запрос в очередь и ждёт future с (lastrowid, rowcount).
+    Пачка закрывается через flush_interval секунд после первого запроса или
+    при наборе batch_size запросов. Каждый запрос выполняется в своём SAVEPOINT,
+    поэтому ошибка одного не откатывает остальные.
+    """
+
+    def __init__(self, db: "Database", batch_size: int, flush_interval: float, max_size: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.statements = 0
+        self.max_batch = 0
+        self.last_flush_ms = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run(), name="sqlite-write-queue")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, sql: str, params: Sequence[Any] = ()) -> WriteResult:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((sql, params, future))
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "batches": self.batches,
+            "statements": self.statements,
+            "avg_batch": self.statements / self.batches if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[tuple]):
+        started = time.perf_counter()
+        results: List[Any] = []
+
+        try:
+            async with self.db.writer() as conn:
+                if not conn.in_transaction:
+                    await conn.execute("BEGIN")
+                for sql, params, _ in batch:
+                    await conn.execute("SAVEPOINT write_queue")
+                    try:
+                        cursor = await conn.execute(sql, params)
+                        results.append((cursor.lastrowid, cursor.rowcount))
+                    except Exception as e:
+                        await conn.execute("ROLLBACK TO write_queue")
+                        results.append(e)
+                    await conn.execute("RELEASE write_queue")
+        except Exception as e:
+            logger.error(f"Ошибка фиксации пачки записей: {e}")
+            results = [e] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+        self.batches += 1
+        self.statements += len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
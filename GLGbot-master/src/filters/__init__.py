@@ -0,0 +1,3 @@
+from src.filters.role import RoleFilter
+
+__all__ = ["RoleFilter"]
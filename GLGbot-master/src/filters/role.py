@@ -0,0 +1,22 @@
+from typing import Optional
+
+from aiogram.filters import BaseFilter
+from aiogram.types import TelegramObject
+
+from src.database.models import User
+
+
+class RoleFilter(BaseFilter):
+    """Пропускает только зарегистрированных пользователей с одной из ролей.
+
+    Без аргументов проверяет только факт регистрации. Пользователь берётся
+    из data["user"], который заполняет AuthMiddleware.
+    """
+
+    def __init__(self, *roles: str):
+        self.roles = roles
+
+    async def __call__(self, event: TelegramObject, user: Optional[User] = None) -> bool:
+        if user is None:
+            return False
+        return not self.roles or user.role in self.roles
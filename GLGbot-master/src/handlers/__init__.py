@@ -1,17 +1,25 @@
 from aiogram import Dispatcher, Bot
 
 
+from src.handlers.buttons import buttons
+from src.handlers.callbacks import callbacks
 from src.handlers.start import router as start_router
 from src.handlers.registration import router as registration_router
 from src.handlers.orders import router as orders_router
 from src.handlers.documents import router as documents_router
 from src.handlers import edit_profile
 from src.handlers.delivery import router as delivery_router
+from src.handlers.subscriptions import router as subscriptions_router
 
 def register_all_handlers(dp: Dispatcher, bot: Bot):
+    # Инлайн-кнопки со схемами CallbackData: один поиск по префиксу
+    dp.include_router(callbacks.router)
+    # Кнопки reply-клавиатур: поиск по тексту раньше сценариев с состояниями
+    dp.include_router(buttons.router)
     dp.include_router(start_router)
     dp.include_router(registration_router)
     dp.include_router(orders_router)
     dp.include_router(documents_router)
     dp.include_router(edit_profile.router)
-    dp.include_router(delivery_router)  
\ No newline at end of file
+    dp.include_router(delivery_router)
+    dp.include_router(subscriptions_router)  
\ No newline at end of file
@@ -0,0 +1,52 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Union
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import SkipHandler
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.types import Message
+
+
+class ButtonTable:
+    """Маршрутизация кнопок reply-клавиатур по точному тексту.
+
+    Обработчики лежат в словаре по тексту кнопки, поэтому сообщение
+    проверяется одним поиском, а не цепочкой F.text == ... по всем
+    роутерам. У одного текста может быть несколько обработчиков с разными
+    фильтрами (роль, состояние): они проверяются в порядке регистрации.
+    Роутер таблицы подключается раньше сценариев с состояниями, так что
+    кнопки меню срабатывают и посреди ввода данных.
+    """
+
+    def __init__(self):
+        self.router = Router(name="buttons")
+        self._handlers: Dict[str, List[HandlerObject]] = defaultdict(list)
+        self.router.message.register(self._dispatch, self._lookup)
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def handler(self, text: str, *filters: Callable):
+        def decorator(callback: Callable) -> Callable:
+            self._handlers[text].append(
+                HandlerObject(callback, filters=[FilterObject(f) for f in filters])
+            )
+            return callback
+        return decorator
+
+    async def _lookup(self, message: Message) -> Union[bool, Dict[str, Any]]:
+        handlers = self._handlers.get(message.text) if message.text else None
+        if not handlers:
+            return False
+        return {"button_handlers": handlers}
+
+    async def _dispatch(self, message: Message, button_handlers: List[HandlerObject], **kwargs: Any) -> Any:
+        for handler in button_handlers:
+            passed, handler_kwargs = await handler.check(message, **kwargs)
+            if passed:
+                return await handler.call(message, **handler_kwargs)
+        # Ни один фильтр не подошёл: сообщение достаётся обычным роутерам
+        raise SkipHandler()
+
+
+buttons = ButtonTable()
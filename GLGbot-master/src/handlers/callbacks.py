@@ -0,0 +1,92 @@
+import re
+from typing import Any, Callable, Dict, List, Set, Tuple, Type, Union
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import SkipHandler
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery
+
+from src.config import logger
+
+
+STALE_BUTTON_TEXT = "⌛ Кнопка устарела. Откройте меню заново."
+
+# Версионный префикс схемы: код и номер версии, "ac1"
+VERSIONED_PREFIX = re.compile(r"([a-z]+)(\d+)")
+
+
+class CallbackTable:
+    """Маршрутизация инлайн-кнопок по префиксу callback_data.
+
+    Вместо цепочки F.data.startswith(...) у роутера один обработчик:
+    префикс ищется в словаре, данные разбираются схемой CallbackData, и
+    вызывается первый зарегистрированный обработчик, чьи фильтры прошли
+    (например, RoleFilter("carrier"), а за ним ответ остальным). Чужие
+    префиксы (confirm, cancel, sub_new ...) проходят дальше по роутерам,
+    а битые данные известной схемы и префиксы известного кода с
+    незарегистрированной версией ("ac1" после перехода на "ac2")
+    отклоняются сообщением об устаревшей кнопке, не доходя до обработчика.
+    """
+
+    def __init__(self):
+        self.router = Router(name="callbacks")
+        self._entries: Dict[str, Tuple[Type[CallbackData], List[HandlerObject]]] = {}
+        self._families: Set[str] = set()
+        self.router.callback_query.register(self._dispatch, self._lookup)
+
+    def handler(self, schema: Type[CallbackData], *filters: Callable, aliases: Tuple[str, ...] = ()):
+        """Регистрирует обработчик схемы.
+
+        aliases — прежние префиксы той же структуры: кнопки в уже
+        отправленных сообщениях продолжают работать.
+        """
+        def decorator(callback: Callable) -> Callable:
+            handler = HandlerObject(callback, filters=[FilterObject(f) for f in filters])
+            for prefix in (schema.__prefix__, *aliases):
+                registered, handlers = self._entries.setdefault(prefix, (schema, []))
+                if registered is not schema:
+                    raise ValueError(f"Префикс callback_data {prefix!r} уже занят схемой {registered.__name__}")
+                handlers.append(handler)
+            versioned = VERSIONED_PREFIX.fullmatch(schema.__prefix__)
+            if versioned:
+                self._families.add(versioned.group(1))
+            return callback
+        return decorator
+
+    async def _lookup(self, callback: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        if not callback.data:
+            return False
+        prefix, separator, payload = callback.data.partition(":")
+        entry = self._entries.get(prefix)
+        if entry is None:
+            versioned = VERSIONED_PREFIX.fullmatch(prefix)
+            if versioned and versioned.group(1) in self._families:
+                # Схему обновили, а кнопка осталась от прежней версии
+                return {"callback_data": None, "callback_handlers": []}
+            return False
+
+        schema, handlers = entry
+        try:
+            data = schema.unpack(schema.__prefix__ + separator + payload)
+        except (TypeError, ValueError):
+            data = None
+        return {"callback_data": data, "callback_handlers": handlers}
+
+    async def _dispatch(self, callback: CallbackQuery, callback_data: CallbackData,
+                        callback_handlers: List[HandlerObject], **kwargs: Any) -> Any:
+        if callback_data is None:
+            logger.info(f"Отклонена устаревшая кнопка {callback.data!r} от {callback.from_user.id}")
+            await callback.answer(STALE_BUTTON_TEXT, show_alert=True)
+            return
+
+        kwargs["callback_data"] = callback_data
+        for handler in callback_handlers:
+            passed, handler_kwargs = await handler.check(callback, **kwargs)
+            if passed:
+                return await handler.call(callback, **handler_kwargs)
+        # Как и не прошедший фильтр в роутере: апдейт достаётся следующим обработчикам
+        raise SkipHandler()
+
+
+callbacks = CallbackTable()
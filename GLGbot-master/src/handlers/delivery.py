@@ -1,33 +1,29 @@
 # src/handlers/delivery.py
 
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import CallbackQuery
 from src.database.crud import update_order_status
+from src.handlers.callbacks import callbacks
+from src.utils.callbacks import DeliveryStage, DeliveryStageUpdate
 from src.utils.states import DeliveryStates
 
 router = Router()
 
-@router.callback_query(F.data.startswith("stage:"))
-async def handle_delivery_stage(callback: CallbackQuery):
-    data_parts = callback.data.split(":")
-    stage = data_parts[1]
-    order_id = int(data_parts[2])
+STAGE_TEXTS = {
+    DeliveryStage.loading: "Погрузка началась 🏗",
+    DeliveryStage.on_way: "Груз в пути 🚚",
+    DeliveryStage.waiting: "Ожидает разгрузки ⏳",
+    DeliveryStage.completed: "Перевозка завершена ✅"
+}
 
-    stage_mapping = {
-        "loading": "Погрузка началась 🏗",
-        "on_way": "Груз в пути 🚚",
-        "waiting": "Ожидает разгрузки ⏳",
-        "completed": "Перевозка завершена ✅"
-    }
-
-    status_text = stage_mapping.get(stage)
-
-    if not status_text:
-        await callback.answer("Неизвестный этап!", show_alert=True)
-        return
+# Неизвестный этап отклоняет сама схема DeliveryStageUpdate
+@callbacks.handler(DeliveryStageUpdate, aliases=("stage",))
+async def handle_delivery_stage(callback: CallbackQuery, callback_data: DeliveryStageUpdate):
+    order_id = callback_data.order_id
+    status_text = STAGE_TEXTS[callback_data.stage]
 
     # Обновляем статус заказа в БД
-    await update_order_status(order_id, stage)
+    await update_order_status(order_id, callback_data.stage.value)
 
     await callback.message.answer(
         f"Статус заказа #{order_id} обновлён:\n{status_text}"
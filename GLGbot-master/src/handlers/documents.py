@@ -1,12 +1,21 @@
 from aiogram import Router, F, Bot
-from aiogram.types import Message, CallbackQuery, FSInputFile
+from aiogram.types import Message, CallbackQuery, FSInputFile, InputMediaPhoto, InputMediaDocument
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
+from aiogram.exceptions import TelegramBadRequest
+from typing import List
+import html
 import os
 
-from src.config import config, logger
-from src.database.crud import get_order_documents, get_order, get_user
-from src.utils.helpers import save_document
+from src.config import logger
+from src.database.crud import (
+    get_order_documents,
+    get_order,
+    set_document_file_id,
+    set_document_preview_file_id
+)
+from src.utils.blobs import store_blob
+from src.services.file_handling import get_document_pipeline
 from src.database.models import Document
 from src.database.crud import add_document
 from src.keyboards.main_kb import get_main_keyboard
@@ -16,15 +25,12 @@ router = Router()
 
 
 async def upload_document_to_order(message: Message, order_id: int, bot: Bot):
-    if not os.path.exists(config.files_dir):
-        os.makedirs(config.files_dir, exist_ok=True)
-    
     if message.photo:
-        file_id = message.photo[-1].file_id
+        file = message.photo[-1]
         file_name = f"photo_{message.message_id}"
         file_type = "photo"
     elif message.document:
-        file_id = message.document.file_id
+        file = message.document
         file_name = message.document.file_name
         file_type = "document"
     else:
@@ -32,16 +38,20 @@ async def upload_document_to_order(message: Message, order_id: int, bot: Bot):
         return None
     
     try:
-        file_path = await save_document(bot, file_id, order_id, file_name)
+        file_path, content_hash = await store_blob(bot, file.file_id)
         
         document = Document(
             order_id=order_id,
             file_path=file_path,
             file_name=file_name,
-            file_type=file_type
+            file_type=file_type,
+            file_id=file.file_id,
+            file_unique_id=file.file_unique_id,
+            content_hash=content_hash
         )
         
         doc_id = await add_document(document)
+        get_document_pipeline().submit(doc_id)
         
         return doc_id
     except Exception as e:
@@ -50,6 +60,95 @@ async def upload_document_to_order(message: Message, order_id: int, bot: Bot):
         return None
 
 
+MEDIA_GROUP_SIZE = 10
+PREVIEW_TEXT_LENGTH = 300
+
+
+def _document_caption(doc: Document) -> str:
+    if doc.page_count is None:
+        return f"Документ: {html.escape(doc.file_name)}"
+    return f"Документ: {html.escape(doc.file_name)} ({doc.page_count} стр.)"
+
+
+def _preview_caption(doc: Document) -> str:
+    caption = f"📄 {html.escape(doc.file_name)}, страниц: {doc.page_count}"
+    text = " ".join((doc.first_page_text or "").split())
+    if text:
+        if len(text) > PREVIEW_TEXT_LENGTH:
+            text = text[:PREVIEW_TEXT_LENGTH].rstrip() + "…"
+        caption += f"\n\n<i>{html.escape(text)}</i>"
+    return caption
+
+
+def _input_media(doc: Document, from_disk: bool, preview: bool = False):
+    if preview:
+        # Первая страница PDF, отрисованная при загрузке: PDF здесь не открываем
+        media = doc.preview_file_id
+        if from_disk or not media:
+            media = FSInputFile(doc.preview_path)
+        return InputMediaPhoto(media=media, caption=_preview_caption(doc))
+
+    if from_disk or not doc.file_id:
+        # Блоб назван по хэшу, поэтому имя для Telegram передаём явно
+        name, extension = os.path.splitext(doc.file_name)
+        if doc.normalized_path and doc.file_type == "photo":
+            # Фото отправляем сжатой копией без EXIF, если она уже готова;
+            # файл, загруженный документом, уходит как есть
+            path, file_name = doc.normalized_path, f"{name}.jpg"
+        else:
+            path = doc.file_path
+            file_name = doc.file_name if extension else f"{name}{os.path.splitext(path)[1]}"
+        media = FSInputFile(path, filename=file_name)
+    else:
+        media = doc.file_id
+    media_class = InputMediaPhoto if doc.file_type == "photo" else InputMediaDocument
+    return media_class(media=media, caption=_document_caption(doc))
+
+
+def _sent_file(message: Message):
+    return message.photo[-1] if message.photo else message.document
+
+
+async def _send_batch(
+    chat_id: int,
+    batch: List[Document],
+    bot: Bot,
+    from_disk: bool,
+    preview: bool = False
+):
+    if len(batch) == 1:
+        media = _input_media(batch[0], from_disk, preview)
+        if isinstance(media, InputMediaPhoto):
+            messages = [await bot.send_photo(chat_id, media.media, caption=media.caption)]
+        else:
+            messages = [await bot.send_document(chat_id, media.media, caption=media.caption)]
+    else:
+        messages = await bot.send_media_group(
+            chat_id, [_input_media(doc, from_disk, preview) for doc in batch]
+        )
+    
+    # После загрузки с диска запоминаем новые file_id, чтобы больше не читать файлы
+    for doc, sent in zip(batch, messages):
+        file = _sent_file(sent)
+        if not file:
+            continue
+        if preview:
+            if from_disk or not doc.preview_file_id:
+                doc.preview_file_id = file.file_id
+                await set_document_preview_file_id(doc.doc_id, file.file_id)
+        elif from_disk or not doc.file_id:
+            doc.file_id, doc.file_unique_id = file.file_id, file.file_unique_id
+            await set_document_file_id(doc.doc_id, doc.file_id, doc.file_unique_id)
+
+
+async def _report_failed(chat_id: int, batch: List[Document], bot: Bot):
+    names = ", ".join(doc.file_name for doc in batch)
+    await bot.send_message(
+        chat_id,
+        f"❌ Ошибка при загрузке документов: {names}"
+    )
+
+
 async def send_order_documents(chat_id: int, order_id: int, bot: Bot):
     documents = await get_order_documents(order_id)
     
@@ -65,24 +164,30 @@ async def send_order_documents(chat_id: int, order_id: int, bot: Bot):
         f"📎 Документы к заказу #{order_id}:"
     )
     
-    for doc in documents:
-        try:
-            file_path = doc.file_path
-            if doc.file_type == "photo":
-                await bot.send_photo(
-                    chat_id,
-                    FSInputFile(file_path),
-                    caption=f"Документ: {doc.file_name}"
-                )
-            else:
-                await bot.send_document(
-                    chat_id,
-                    FSInputFile(file_path),
-                    caption=f"Документ: {doc.file_name}"
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при отправке документа: {e}")
-            await bot.send_message(
-                chat_id,
-                f"❌ Ошибка при загрузке документа {doc.file_name}"
-            )
+    # Фото и файлы нельзя смешивать в одной медиагруппе
+    photos = [doc for doc in documents if doc.file_type == "photo"]
+    files = [doc for doc in documents if doc.file_type != "photo"]
+    # У обработанных PDF перед самими файлами показываем превью первой страницы
+    previews = [doc for doc in files if doc.page_count is not None and doc.preview_path]
+    
+    for group, preview in ((photos, False), (previews, True), (files, False)):
+        for i in range(0, len(group), MEDIA_GROUP_SIZE):
+            batch = group[i:i + MEDIA_GROUP_SIZE]
+            try:
+                await _send_batch(chat_id, batch, bot, from_disk=False, preview=preview)
+            except TelegramBadRequest as e:
+                # file_id устарел или недоступен боту: сбрасываем и загружаем с диска
+                logger.warning(f"Не удалось отправить документы по file_id, загружаем с диска: {e}")
+                for doc in batch:
+                    if preview and doc.preview_file_id:
+                        await set_document_preview_file_id(doc.doc_id, None)
+                    elif not preview and doc.file_id:
+                        await set_document_file_id(doc.doc_id, None)
+                try:
+                    await _send_batch(chat_id, batch, bot, from_disk=True, preview=preview)
+                except Exception as e:
+                    logger.error(f"Ошибка при отправке документов: {e}")
+                    await _report_failed(chat_id, batch, bot)
+            except Exception as e:
+                logger.error(f"Ошибка при отправке документов: {e}")
+                await _report_failed(chat_id, batch, bot)
@@ -1,10 +1,13 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message
 from aiogram.fsm.context import FSMContext
 from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
 
 
-from src.database.crud import get_user, update_user_field
+from src.database.crud import update_user_field
+from src.database.models import User
+from src.filters import RoleFilter
+from src.handlers.buttons import buttons
 from src.keyboards.registration_kb import get_skip_keyboard
 from src.keyboards.main_kb import get_main_keyboard
 from src.utils.states import EditProfileStates
@@ -19,10 +22,10 @@ FIELDS = {
     "Компания": "company",
 }
 
-@router.message(F.text == "✏️ Редактировать профиль")
+@buttons.handler("✏️ Редактировать профиль", RoleFilter())
 async def edit_profile_start(message: Message, state: FSMContext):
-    buttons = [KeyboardButton(text=field) for field in FIELDS.keys()]
-    kb = ReplyKeyboardMarkup(keyboard=[buttons], resize_keyboard=True, one_time_keyboard=False)
+    row = [KeyboardButton(text=field) for field in FIELDS.keys()]
+    kb = ReplyKeyboardMarkup(keyboard=[row], resize_keyboard=True, one_time_keyboard=False)
 
     await message.answer("Что хотите изменить?", reply_markup=kb)
     await state.set_state(EditProfileStates.choosing_field)
@@ -43,13 +46,13 @@ async def choose_field(message: Message, state: FSMContext):
 
 
 @router.message(EditProfileStates.entering_new_value)
-async def update_field(message: Message, state: FSMContext):
+async def update_field(message: Message, state: FSMContext, user: User):
     user_data = await state.get_data()
     field = user_data["field"]
     new_value = message.text
 
     if new_value == "⏭️ Пропустить":
-        await message.answer("Редактирование отменено.", reply_markup=get_main_keyboard("sender"))
+        await message.answer("Редактирование отменено.", reply_markup=get_main_keyboard(user.role))
         await state.clear()
         return
 
@@ -61,8 +64,7 @@ async def update_field(message: Message, state: FSMContext):
         await message.answer("❌ Введите корректный email.")
         return
 
-    user_id = message.from_user.id
-    await update_user_field(user_id, field, new_value)
+    await update_user_field(user.user_id, field, new_value)
 
-    await message.answer("✅ Данные успешно обновлены!", reply_markup=get_main_keyboard("sender"))
+    await message.answer("✅ Данные успешно обновлены!", reply_markup=get_main_keyboard(user.role))
     await state.clear()
@@ -1,16 +1,28 @@
 from aiogram import Router, F, Bot
-from aiogram.types import Message, CallbackQuery, FSInputFile
+from aiogram.types import Message, CallbackQuery, FSInputFile, InlineKeyboardMarkup
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
+from aiogram.exceptions import TelegramBadRequest
 from datetime import datetime
-import os
+from typing import Optional, Tuple
 
 from src.utils.states import OrderCreationStates, OrderSearchStates
+from src.utils.callbacks import (
+    AcceptOrder,
+    ConfirmDelivery,
+    MarkDelivered,
+    MyOrders,
+    MyOrdersSummary,
+    OrdersPage,
+    ViewDocuments,
+    ViewOrder
+)
 from src.utils.helpers import (
-    format_order_info, 
     is_valid_weight, 
     get_status_emoji,
-    save_document
+    get_status_text,
+    encode_order_cursor,
+    decode_order_cursor
 )
 from src.database.models import User, Order, Document
 from src.database.crud import (
@@ -18,10 +30,14 @@ from src.database.crud import (
     add_order, 
     add_document, 
     get_order, 
-    update_order,
-    get_available_orders,
-    get_user_orders,
-    get_order_documents
+    accept_order_atomic,
+    change_order_status,
+    get_available_orders_page,
+    count_available_orders,
+    count_user_orders_by_status,
+    get_user_orders_page,
+    get_order_thumbnail,
+    set_document_thumbnail_file_id
 )
 from src.keyboards.orders_kb import (
     get_create_order_keyboard, 
@@ -30,27 +46,49 @@ from src.keyboards.orders_kb import (
     get_confirm_order_keyboard,
     get_document_keyboard,
     get_skip_keyboard,
-    get_accept_order_keyboard,
     get_order_details_keyboard,
-    get_orders_navigation_keyboard
+    get_available_orders_keyboard,
+    get_my_orders_summary_keyboard,
+    get_my_orders_page_keyboard
 )
 from src.keyboards.main_kb import (
     get_main_keyboard, 
     get_confirmation_keyboard,
     get_cancel_keyboard
 )
-from src.config import config, logger
+from src.handlers.buttons import buttons
+from src.handlers.callbacks import callbacks
+from src.handlers.documents import send_order_documents
+from src.utils.blobs import store_blob
+from src.services.file_handling import get_document_pipeline
+from src.services.notifications import (
+    new_order_notifications,
+    order_accepted_notifications,
+    order_delivered_notifications,
+    order_completed_notifications
+)
+from src.services.outbox import wake_outbox
+from src.filters import RoleFilter
 
 
 router = Router()
 ORDERS_PER_PAGE = 5
+CAPTION_LIMIT = 1024
 
 
-@router.message(F.text == "📝 Создать заявку")
+@buttons.handler("📝 Создать заявку", RoleFilter("sender"))
 async def create_order_start(message: Message, state: FSMContext):
-    user_id = message.from_user.id
-    user = await get_user(user_id)
+    await message.answer(
+        "📦 <b>Создание новой заявки на перевозку</b>\n\n"
+        "Выберите тип груза:",
+        reply_markup=get_cargo_type_keyboard()
+    )
     
+    await state.set_state(OrderCreationStates.waiting_for_cargo_type)
+
+
+@buttons.handler("📝 Создать заявку")
+async def create_order_forbidden(message: Message, user: Optional[User]):
     if not user:
         await message.answer(
             "❌ Для создания заявки необходимо зарегистрироваться.",
@@ -58,20 +96,10 @@ async def create_order_start(message: Message, state: FSMContext):
         )
         return
     
-    if user.role != "sender":
-        await message.answer(
-            "❌ Создавать заявки могут только отправители грузов.",
-            reply_markup=get_main_keyboard(user.role)
-        )
-        return
-    
     await message.answer(
-        "📦 <b>Создание новой заявки на перевозку</b>\n\n"
-        "Выберите тип груза:",
-        reply_markup=get_cargo_type_keyboard()
+        "❌ Создавать заявки могут только отправители грузов.",
+        reply_markup=get_main_keyboard(user.role)
     )
-    
-    await state.set_state(OrderCreationStates.waiting_for_cargo_type)
 
 
 @router.message(OrderCreationStates.waiting_for_cargo_type)
@@ -225,7 +253,8 @@ async def confirm_order(callback: CallbackQuery, state: FSMContext):
         comment=user_data.get("comment")
     )
     
-    order_id = await add_order(order)
+    order_id = await add_order(order, new_order_notifications)
+    wake_outbox()
     
     await callback.message.answer(
         f"✅ Заявка #{order_id} успешно создана!\n\n"
@@ -241,9 +270,7 @@ async def confirm_order(callback: CallbackQuery, state: FSMContext):
 
 
 @router.callback_query(OrderCreationStates.confirmation, F.data == "cancel")
-async def cancel_order_confirmation(callback: CallbackQuery, state: FSMContext):
-    user = await get_user(callback.from_user.id)
-    
+async def cancel_order_confirmation(callback: CallbackQuery, state: FSMContext, user: User):
     await callback.message.answer(
         "❌ Создание заявки отменено. Вы можете начать заново или вернуться в главное меню.",
         reply_markup=get_main_keyboard(user.role)
@@ -253,7 +280,7 @@ async def cancel_order_confirmation(callback: CallbackQuery, state: FSMContext):
     await state.clear()
 
 
-@router.message(OrderCreationStates.waiting_for_documents, F.text == "📎 Добавить документ")
+@buttons.handler("📎 Добавить документ", OrderCreationStates.waiting_for_documents)
 async def add_document_prompt(message: Message):
     await message.answer(
         "📎 Отправьте документ (фото или файл), который нужно прикрепить к заявке.",
@@ -266,28 +293,29 @@ async def process_document(message: Message, state: FSMContext, bot: Bot):
     user_data = await state.get_data()
     order_id = user_data["order_id"]
     
-    if not os.path.exists(config.files_dir):
-        os.makedirs(config.files_dir, exist_ok=True)
-    
     if message.photo:
-        file_id = message.photo[-1].file_id
+        file = message.photo[-1]
         file_name = f"photo_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         file_type = "photo"
     else:
-        file_id = message.document.file_id
+        file = message.document
         file_name = message.document.file_name
         file_type = "document"
     
-    file_path = await save_document(bot, file_id, order_id, file_name)
+    file_path, content_hash = await store_blob(bot, file.file_id)
     
     document = Document(
         order_id=order_id,
         file_path=file_path,
         file_name=file_name,
-        file_type=file_type
+        file_type=file_type,
+        file_id=file.file_id,
+        file_unique_id=file.file_unique_id,
+        content_hash=content_hash
     )
     
     doc_id = await add_document(document)
+    get_document_pipeline().submit(doc_id)
     
     await message.answer(
         f"✅ Документ успешно добавлен к заявке #{order_id}.\n\n"
@@ -296,11 +324,10 @@ async def process_document(message: Message, state: FSMContext, bot: Bot):
     )
 
 
-@router.message(OrderCreationStates.waiting_for_documents, F.text == "✅ Завершить")
-async def finish_order_creation(message: Message, state: FSMContext):
+@buttons.handler("✅ Завершить", OrderCreationStates.waiting_for_documents)
+async def finish_order_creation(message: Message, state: FSMContext, user: User):
     user_data = await state.get_data()
     order_id = user_data["order_id"]
-    user = await get_user(message.from_user.id)
     
     await message.answer(
         f"✅ Создание заявки #{order_id} завершено!\n\n"
@@ -312,11 +339,13 @@ async def finish_order_creation(message: Message, state: FSMContext):
     await state.clear()
 
 
-@router.message(F.text == "🔍 Найти заказы")
+@buttons.handler("🔍 Найти заказы", RoleFilter("carrier"))
 async def find_orders(message: Message, state: FSMContext):
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-    
+    await show_available_orders(message, state, 1)
+
+
+@buttons.handler("🔍 Найти заказы")
+async def find_orders_forbidden(message: Message, user: Optional[User]):
     if not user:
         await message.answer(
             "❌ Для поиска заказов необходимо зарегистрироваться.",
@@ -324,66 +353,87 @@ async def find_orders(message: Message, state: FSMContext):
         )
         return
     
-    if user.role != "carrier":
-        await message.answer(
-            "❌ Искать заказы могут только перевозчики.",
-            reply_markup=get_main_keyboard(user.role)
-        )
-        return
-    
-    await show_available_orders(message, state, 1)
+    await message.answer(
+        "❌ Искать заказы могут только перевозчики.",
+        reply_markup=get_main_keyboard(user.role)
+    )
 
 
-async def show_available_orders(message: Message, state: FSMContext, page: int = 1):
-    available_orders = await get_available_orders()
+async def show_available_orders(
+    message: Message,
+    state: FSMContext,
+    page: int = 1,
+    before: Optional[Tuple[str, int]] = None,
+    after: Optional[Tuple[str, int]] = None,
+    edit: bool = False
+):
+    page_orders = await get_available_orders_page(ORDERS_PER_PAGE, before=before, after=after)
     
-    if not available_orders:
-        await message.answer(
+    if not page_orders:
+        empty_text = (
             "📭 На данный момент нет доступных заказов.\n"
-            "Проверьте позже или подпишитесь на уведомления.",
-            reply_markup=get_main_keyboard("carrier")
+            "Проверьте позже или подпишитесь на уведомления."
         )
+        if edit:
+            await message.edit_text(empty_text)
+        else:
+            await message.answer(empty_text, reply_markup=get_main_keyboard("carrier"))
         return
     
-    start_idx = (page - 1) * ORDERS_PER_PAGE
-    end_idx = start_idx + ORDERS_PER_PAGE
-    page_orders = available_orders[start_idx:end_idx]
-    
-    total_pages = (len(available_orders) + ORDERS_PER_PAGE - 1) // ORDERS_PER_PAGE
+    total_orders = await count_available_orders()
+    total_pages = max((total_orders + ORDERS_PER_PAGE - 1) // ORDERS_PER_PAGE, page)
+    if len(page_orders) < ORDERS_PER_PAGE and before is not None:
+        total_pages = page
     
+    lines = [f"🔍 <b>Доступные заказы</b> (страница {page} из {total_pages})"]
     for order in page_orders:
-        order_text = (
-            f"🆕 <b>Заказ #{order.order_id}</b>\n\n"
-            f"Тип груза: {order.cargo_type}\n"
-            f"Вес: {order.weight} кг\n"
+        lines.append(
+            f"\n🆕 <b>Заказ #{order.order_id}</b>\n"
+            f"Тип груза: {order.cargo_type}, {order.weight} кг\n"
             f"Откуда: {order.pickup_address}\n"
             f"Куда: {order.delivery_address}\n"
             f"Дата загрузки: {order.pickup_date}"
         )
-        
-        await message.answer(
-            order_text,
-            reply_markup=get_accept_order_keyboard(order.order_id)
-        )
     
-    if total_pages > 1:
-        await message.answer(
-            f"Страница {page} из {total_pages}",
-            reply_markup=get_orders_navigation_keyboard(page, total_pages)
-        )
+    first, last = page_orders[0], page_orders[-1]
+    keyboard = get_available_orders_keyboard(
+        [order.order_id for order in page_orders],
+        page,
+        total_pages,
+        encode_order_cursor(first.creation_date, first.order_id),
+        encode_order_cursor(last.creation_date, last.order_id)
+    )
+    
+    if edit:
+        try:
+            await message.edit_text("\n".join(lines), reply_markup=keyboard)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in str(e):
+                raise
+    else:
+        await message.answer("\n".join(lines), reply_markup=keyboard)
 
 
-@router.callback_query(F.data.startswith("orders_page:"))
-async def navigate_orders(callback: CallbackQuery, state: FSMContext):
-    page = int(callback.data.split(":")[1])
-    await show_available_orders(callback.message, state, page)
+@callbacks.handler(OrdersPage, aliases=("orders_page",))
+async def navigate_orders(callback: CallbackQuery, callback_data: OrdersPage, state: FSMContext):
+    before = after = None
+    
+    if callback_data.cursor:
+        cursor = decode_order_cursor(callback_data.cursor)
+        if callback_data.direction == "n":
+            before = cursor
+        else:
+            after = cursor
+    
+    await show_available_orders(
+        callback.message, state, callback_data.page, before=before, after=after, edit=True
+    )
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("view_order:"))
-async def view_order_details(callback: CallbackQuery, state: FSMContext):
-    order_id = int(callback.data.split(":")[1])
-    user = await get_user(callback.from_user.id)
+@callbacks.handler(ViewOrder, RoleFilter(), aliases=("view_order",))
+async def view_order_details(callback: CallbackQuery, callback_data: ViewOrder, state: FSMContext, user: User):
+    order_id = callback_data.order_id
     
     order = await get_order(order_id)
     if not order:
@@ -406,39 +456,54 @@ async def view_order_details(callback: CallbackQuery, state: FSMContext):
         f"Статус: {get_status_emoji(order.status)} {order.status}"
     )
     
+    keyboard = get_order_details_keyboard(order.order_id, order.status, user.role)
+    
+    thumbnail = await get_order_thumbnail(order.order_id)
+    if thumbnail and len(order_text) <= CAPTION_LIMIT:
+        sent = await callback.message.answer_photo(
+            thumbnail.thumbnail_file_id or FSInputFile(thumbnail.thumbnail_path),
+            caption=order_text,
+            reply_markup=keyboard
+        )
+        if not thumbnail.thumbnail_file_id and sent.photo:
+            await set_document_thumbnail_file_id(thumbnail.doc_id, sent.photo[-1].file_id)
+    else:
+        await callback.message.answer(order_text, reply_markup=keyboard)
+    
+    await callback.answer()
+
+
+@callbacks.handler(ViewOrder, aliases=("view_order",))
+async def view_order_unregistered(callback: CallbackQuery):
     await callback.message.answer(
-        order_text,
-        reply_markup=get_order_details_keyboard(order.order_id, order.status, user.role)
+        "❌ Для просмотра заказов необходимо зарегистрироваться.",
+        reply_markup=get_cancel_keyboard()
     )
-    
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("accept_order:"))
-async def accept_order(callback: CallbackQuery, state: FSMContext, bot: Bot):
-    order_id = int(callback.data.split(":")[1])
-    carrier_id = callback.from_user.id
+@callbacks.handler(AcceptOrder, RoleFilter("carrier"), aliases=("accept_order",))
+async def accept_order(callback: CallbackQuery, callback_data: AcceptOrder, state: FSMContext, user: User):
+    order_id = callback_data.order_id
+    carrier = user
+    carrier_id = carrier.user_id
     
-    order = await get_order(order_id)
+    order = await accept_order_atomic(
+        order_id, carrier_id, lambda order: order_accepted_notifications(order, carrier)
+    )
     if not order:
-        await callback.message.answer("❌ Заказ не найден.")
-        await callback.answer()
-        return
-    
-    if order.status != "new":
-        await callback.message.answer(
-            "❌ Этот заказ уже принят другим перевозчиком."
-        )
+        if await get_order(order_id):
+            await callback.message.answer(
+                "❌ Этот заказ уже принят другим перевозчиком."
+            )
+        else:
+            await callback.message.answer("❌ Заказ не найден.")
         await callback.answer()
         return
     
-    carrier = await get_user(carrier_id)
+    wake_outbox()
     sender = await get_user(order.sender_id)
     
-    order.carrier_id = carrier_id
-    order.status = "accepted"
-    await update_order(order)
-    
     await callback.message.answer(
         f"✅ Вы успешно приняли заказ #{order.order_id}!\n\n"
         f"Теперь вы можете связаться с отправителем:\n"
@@ -447,181 +512,140 @@ async def accept_order(callback: CallbackQuery, state: FSMContext, bot: Bot):
         f"Email: {sender.email or 'Не указан'}"
     )
     
-    try:
-        await bot.send_message(
-            order.sender_id,
-            f"🎉 Ваш заказ #{order.order_id} был принят перевозчиком!\n\n"
-            f"Данные перевозчика:\n"
-            f"Имя: {carrier.full_name}\n"
-            f"Телефон: {carrier.phone}\n"
-            f"Email: {carrier.email or 'Не указан'}\n\n"
-            f"Вы можете связаться с ним для уточнения деталей."
-        )
-    except Exception as e:
-        logger.error(f"Не удалось отправить уведомление отправителю: {e}")
-    
     await callback.answer()
 
 
-@router.message(F.text == "📋 Мои заявки")
-async def show_my_orders(message: Message, state: FSMContext):
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-    
+@callbacks.handler(AcceptOrder, aliases=("accept_order",))
+async def accept_order_forbidden(callback: CallbackQuery, user: Optional[User]):
     if not user:
-        await message.answer(
-            "❌ Для просмотра заявок необходимо зарегистрироваться.",
+        await callback.message.answer(
+            "❌ Для принятия заказов необходимо зарегистрироваться.",
             reply_markup=get_cancel_keyboard()
         )
-        return
-    
-    orders = await get_user_orders(user_id, user.role)
-    
-    if not orders:
-        role_text = "созданных заявок" if user.role == "sender" else "принятых заказов"
-        await message.answer(
-            f"📭 У вас пока нет {role_text}.",
+    else:
+        await callback.message.answer(
+            "❌ Принимать заказы могут только перевозчики.",
             reply_markup=get_main_keyboard(user.role)
         )
-        return
+    await callback.answer()
+
+
+async def render_my_orders_summary(user: User) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    counts = await count_user_orders_by_status(user.user_id, user.role)
     
-    await message.answer(
-        f"📋 <b>Ваши {'заявки' if user.role == 'sender' else 'заказы'}:</b>"
+    if not counts:
+        role_text = "созданных заявок" if user.role == "sender" else "принятых заказов"
+        return f"📭 У вас пока нет {role_text}.", None
+    
+    lines = [
+        f"📋 <b>Ваши {'заявки' if user.role == 'sender' else 'заказы'}</b>: {sum(counts.values())}\n"
+    ]
+    for status, count in counts.items():
+        lines.append(f"{get_status_emoji(status)} {get_status_text(status)}: {count}")
+    lines.append("\nВыберите статус, чтобы посмотреть заказы.")
+    
+    return "\n".join(lines), get_my_orders_summary_keyboard(counts)
+
+
+@buttons.handler("📋 Мои заявки", RoleFilter())
+async def show_my_orders(message: Message, state: FSMContext, user: User):
+    text, keyboard = await render_my_orders_summary(user)
+    await message.answer(text, reply_markup=keyboard or get_main_keyboard(user.role))
+
+
+@callbacks.handler(MyOrdersSummary, RoleFilter(), aliases=("my_orders_summary",))
+async def my_orders_summary(callback: CallbackQuery, user: User):
+    text, keyboard = await render_my_orders_summary(user)
+    await callback.message.edit_text(text, reply_markup=keyboard)
+    await callback.answer()
+
+
+@callbacks.handler(MyOrders, RoleFilter(), aliases=("my_orders",))
+async def my_orders_by_status(callback: CallbackQuery, callback_data: MyOrders, user: User):
+    status = callback_data.status
+    
+    counts = await count_user_orders_by_status(user.user_id, user.role)
+    total_pages = max((counts.get(status, 0) + ORDERS_PER_PAGE - 1) // ORDERS_PER_PAGE, 1)
+    page = min(callback_data.page, total_pages)
+    
+    orders = await get_user_orders_page(
+        user.user_id, user.role, status, ORDERS_PER_PAGE, (page - 1) * ORDERS_PER_PAGE
     )
     
+    lines = [
+        f"{get_status_emoji(status)} <b>{get_status_text(status)}</b> "
+        f"(страница {page} из {total_pages})"
+    ]
     for order in orders:
-        status_emoji = get_status_emoji(order.status)
-        status_text = {
-            "new": "Новая",
-            "accepted": "Принята",
-            "in_progress": "В пути",
-            "completed": "Завершена",
-            "cancelled": "Отменена"
-        }.get(order.status, order.status)
-        
-        order_text = format_order_info(
-            order.order_id, 
-            order.cargo_type, 
-            order.weight, 
-            order.pickup_address, 
-            order.delivery_address, 
-            order.pickup_date,
-            order.dimensions,
-            f"{status_emoji} {status_text}"
+        lines.append(
+            f"\n📦 <b>#{order.order_id}</b> {order.cargo_type}, {order.weight} кг\n"
+            f"{order.pickup_address} → {order.delivery_address}, {order.pickup_date}"
         )
-        
-        await message.answer(
-            order_text,
-            reply_markup=get_order_details_keyboard(order.order_id, order.status, user.role)
+    if not orders:
+        lines.append("\nЗаказов с этим статусом больше нет.")
+    
+    await callback.message.edit_text(
+        "\n".join(lines),
+        reply_markup=get_my_orders_page_keyboard(
+            [order.order_id for order in orders], status, page, total_pages
         )
+    )
+    await callback.answer()
 
 
-@router.callback_query(F.data.startswith("mark_delivered:"))
-async def mark_delivered(callback: CallbackQuery, state: FSMContext, bot: Bot):
-    order_id = int(callback.data.split(":")[1])
+@buttons.handler("📋 Мои заявки")
+async def show_my_orders_unregistered(message: Message):
+    await message.answer(
+        "❌ Для просмотра заявок необходимо зарегистрироваться.",
+        reply_markup=get_cancel_keyboard()
+    )
+
+
+@callbacks.handler(MarkDelivered, aliases=("mark_delivered",))
+async def mark_delivered(callback: CallbackQuery, callback_data: MarkDelivered, state: FSMContext):
+    order_id = callback_data.order_id
     
-    order = await get_order(order_id)
+    order = await change_order_status(order_id, "accepted", "delivered", order_delivered_notifications)
     if not order:
-        await callback.message.answer("❌ Заказ не найден.")
-        await callback.answer()
-        return
-    
-    if order.status != "accepted":
-        await callback.message.answer("❌ Невозможно отметить заказ как доставленный.")
+        if await get_order(order_id):
+            await callback.message.answer("❌ Невозможно отметить заказ как доставленный.")
+        else:
+            await callback.message.answer("❌ Заказ не найден.")
         await callback.answer()
         return
     
-    order.status = "delivered"
-    await update_order(order)
-    
+    wake_outbox()
     await callback.message.answer(
         f"✅ Заказ #{order.order_id} отмечен как доставленный.\n"
         f"Ожидаем подтверждения от отправителя."
     )
     
-    try:
-        await bot.send_message(
-            order.sender_id,
-            f"🚚 Перевозчик отметил заказ #{order.order_id} как доставленный.\n"
-            f"Пожалуйста, подтвердите получение груза."
-        )
-    except Exception as e:
-        logger.error(f"Не удалось отправить уведомление отправителю: {e}")
-    
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("confirm_delivery:"))
-async def confirm_delivery(callback: CallbackQuery, state: FSMContext, bot: Bot):
-    order_id = int(callback.data.split(":")[1])
+@callbacks.handler(ConfirmDelivery, aliases=("confirm_delivery",))
+async def confirm_delivery(callback: CallbackQuery, callback_data: ConfirmDelivery, state: FSMContext):
+    order_id = callback_data.order_id
     
-    order = await get_order(order_id)
+    order = await change_order_status(order_id, "delivered", "completed", order_completed_notifications)
     if not order:
-        await callback.message.answer("❌ Заказ не найден.")
-        await callback.answer()
-        return
-    
-    if order.status != "delivered":
-        await callback.message.answer("❌ Невозможно подтвердить получение.")
+        if await get_order(order_id):
+            await callback.message.answer("❌ Невозможно подтвердить получение.")
+        else:
+            await callback.message.answer("❌ Заказ не найден.")
         await callback.answer()
         return
     
-    order.status = "completed"
-    await update_order(order)
-    
+    wake_outbox()
     await callback.message.answer(
         f"✅ Доставка заказа #{order.order_id} подтверждена.\n"
         f"Заказ успешно завершен!"
     )
     
-    try:
-        await bot.send_message(
-            order.carrier_id,
-            f"🎉 Отправитель подтвердил получение заказа #{order.order_id}.\n"
-            f"Заказ успешно завершен!"
-        )
-    except Exception as e:
-        logger.error(f"Не удалось отправить уведомление перевозчику: {e}")
-    
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("view_documents:"))
-async def view_documents(callback: CallbackQuery, state: FSMContext, bot: Bot):
-    order_id = int(callback.data.split(":")[1])
-    
-    documents = await get_order_documents(order_id)
-    
-    if not documents:
-        await callback.message.answer(
-            f"📎 К заказу #{order_id} не прикреплено документов."
-        )
-        await callback.answer()
-        return
-    
-    await callback.message.answer(
-        f"📎 Документы к заказу #{order_id}:"
-    )
-    
-    for doc in documents:
-        try:
-            file_path = doc.file_path
-            if doc.file_type == "photo":
-                await bot.send_photo(
-                    callback.from_user.id,
-                    FSInputFile(file_path),
-                    caption=f"Документ: {doc.file_name}"
-                )
-            else:
-                await bot.send_document(
-                    callback.from_user.id,
-                    FSInputFile(file_path),
-                    caption=f"Документ: {doc.file_name}"
-                )
-        except Exception as e:
-            logger.error(f"Ошибка при отправке документа: {e}")
-            await callback.message.answer(
-                f"❌ Ошибка при загрузке документа {doc.file_name}"
-            )
-    
+@callbacks.handler(ViewDocuments, aliases=("view_documents",))
+async def view_documents(callback: CallbackQuery, callback_data: ViewDocuments, state: FSMContext, bot: Bot):
+    await send_order_documents(callback.message.chat.id, callback_data.order_id, bot)
     await callback.answer()
@@ -2,28 +2,28 @@ from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
+from sqlite3 import IntegrityError
+from typing import Optional
 
 from src.utils.states import RegistrationStates
 from src.utils.helpers import is_valid_phone, is_valid_email
 from src.database.models import User
 from src.database.crud import add_user, get_user
+from src.handlers.buttons import buttons
 from src.keyboards.registration_kb import get_role_keyboard, get_skip_keyboard, get_phone_keyboard
 from src.keyboards.main_kb import get_main_keyboard, get_confirmation_keyboard
 
 router = Router()
 
-@router.message(F.text == "🚀 Зарегистрироваться")
-async def registration_start(message: Message, state: FSMContext):
+@buttons.handler("🚀 Зарегистрироваться")
+async def registration_start(message: Message, state: FSMContext, user: Optional[User]):
     await state.clear()
 
-    user_id = message.from_user.id
-    existing_user = await get_user(user_id)
-
-    if existing_user:
+    if user:
         await message.answer(
-            f"Вы уже зарегистрированы как {existing_user.role}.\n"
+            f"Вы уже зарегистрированы как {user.role}.\n"
             "Используйте кнопки для навигации по боту.",
-            reply_markup=get_main_keyboard(existing_user.role)
+            reply_markup=get_main_keyboard(user.role)
         )
         return
 
@@ -169,7 +169,19 @@ async def confirm_registration(callback: CallbackQuery, state: FSMContext):
         role=user_data["role"]
     )
 
-    await add_user(user)
+    try:
+        await add_user(user)
+    except IntegrityError:
+        # Регистрацию уже подтвердили: повторное нажатие или другой процесс бота
+        await state.clear()
+        user = await get_user(user.user_id)
+        await callback.message.answer(
+            "Вы уже зарегистрированы.\n"
+            "Используйте кнопки для навигации по боту.",
+            reply_markup=get_main_keyboard(user.role)
+        )
+        await callback.answer()
+        return
 
     role_text = "отправителя" if user.role == "sender" else "перевозчика"
 
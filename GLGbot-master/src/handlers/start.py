@@ -1,10 +1,13 @@
-from aiogram import Router, F
+from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
+from typing import Optional
 
 from src.config import logger
-from src.database.crud import get_user
+from src.database.models import User
+from src.filters import RoleFilter
+from src.handlers.buttons import buttons
 from src.keyboards.main_kb import (
     get_start_keyboard,
     get_main_keyboard,
@@ -14,12 +17,9 @@ router = Router()
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message, state: FSMContext):
+async def cmd_start(message: Message, state: FSMContext, user: Optional[User]):
     await state.clear()
 
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-
     if user:
         text = (
             f"👋 Добро пожаловать обратно, {user.full_name}!\n\n"
@@ -40,11 +40,8 @@ async def cmd_start(message: Message, state: FSMContext):
 
 
 @router.message(Command("help"))
-@router.message(F.text == "ℹ️ Информация")
-async def cmd_help(message: Message):
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-
+@buttons.handler("ℹ️ Информация")
+async def cmd_help(message: Message, user: Optional[User]):
     text = (
         "🤖 <b>Бот для грузоперевозок</b>\n\n"
         "Вы можете:\n"
@@ -61,42 +58,26 @@ async def cmd_help(message: Message):
     await message.answer(text, reply_markup=keyboard)
 
 
-@router.message(F.text == "❌ Отмена")
-async def cancel_handler(message: Message, state: FSMContext):
+@buttons.handler("❌ Отмена")
+async def cancel_handler(message: Message, state: FSMContext, user: Optional[User]):
     current_state = await state.get_state()
     if current_state:
         await state.clear()
 
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-
     keyboard = get_main_keyboard(user.role) if user else get_start_keyboard()
     await message.answer("❌ Действие отменено. Выберите дальнейшее действие:", reply_markup=keyboard)
 
 
-@router.message(F.text == "◀️ Назад")
-async def back_handler(message: Message, state: FSMContext):
+@buttons.handler("◀️ Назад")
+async def back_handler(message: Message, state: FSMContext, user: Optional[User]):
     await state.clear()
 
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-
     keyboard = get_main_keyboard(user.role) if user else get_start_keyboard()
     await message.answer("Вы вернулись в главное меню. Выберите действие:", reply_markup=keyboard)
 
 
-@router.message(F.text == "🧑‍💼 Личный кабинет")
-async def personal_account(message: Message):
-    user_id = message.from_user.id
-    user = await get_user(user_id)
-
-    if not user:
-        await message.answer(
-            "Для доступа к личному кабинету необходимо зарегистрироваться.",
-            reply_markup=get_start_keyboard()
-        )
-        return
-
+@buttons.handler("🧑‍💼 Личный кабинет", RoleFilter())
+async def personal_account(message: Message, user: User):
     role_text = "Отправитель" if user.role == "sender" else "Перевозчик"
 
     profile_info = (
@@ -112,3 +93,11 @@ async def personal_account(message: Message):
     )
 
     await message.answer(profile_info, reply_markup=get_main_keyboard(user.role))
+
+
+@buttons.handler("🧑‍💼 Личный кабинет")
+async def personal_account_unregistered(message: Message):
+    await message.answer(
+        "Для доступа к личному кабинету необходимо зарегистрироваться.",
+        reply_markup=get_start_keyboard()
+    )
@@ -0,0 +1,229 @@
+from aiogram import Router, F
+from aiogram.types import Message, CallbackQuery
+from aiogram.fsm.context import FSMContext
+from datetime import date
+from typing import Optional, Tuple
+
+from src.config import logger
+from src.database.crud import add_subscription, delete_subscription, get_carrier_subscriptions
+from src.database.models import Subscription, User
+from src.filters import RoleFilter
+from src.handlers.buttons import buttons
+from src.handlers.callbacks import callbacks
+from src.keyboards.main_kb import get_main_keyboard, get_confirmation_keyboard
+from src.keyboards.registration_kb import get_skip_keyboard
+from src.keyboards.subscriptions_kb import get_subscription_cargo_keyboard, get_subscriptions_keyboard
+from src.services.subscriptions import MAX_CITY_WORDS, normalize_city, subscription_index
+from src.utils.helpers import parse_pickup_date, parse_weight_range
+from src.utils.callbacks import DeleteSubscription
+from src.utils.states import SubscriptionStates
+
+
+router = Router()
+
+SKIP = "⏭️ Пропустить"
+MAX_SUBSCRIPTIONS = 10
+CARGO_TYPES = {
+    "📦 Стандартный": "Стандартный",
+    "📏 Негабаритный": "Негабаритный",
+    "🔶 Хрупкий": "Хрупкий",
+    "🔒 Ценный": "Ценный",
+    "🌐 Любой": None,
+}
+
+
+def _format_day(value: Optional[str]) -> str:
+    return date.fromisoformat(value).strftime("%d.%m.%Y") if value else "…"
+
+
+def format_subscription(subscription: Subscription) -> str:
+    if subscription.min_weight is not None and subscription.max_weight is not None:
+        weight = f"{subscription.min_weight:g}–{subscription.max_weight:g} кг"
+    elif subscription.min_weight is not None:
+        weight = f"от {subscription.min_weight:g} кг"
+    elif subscription.max_weight is not None:
+        weight = f"до {subscription.max_weight:g} кг"
+    else:
+        weight = "любой"
+
+    if subscription.date_from or subscription.date_to:
+        dates = f"{_format_day(subscription.date_from)} — {_format_day(subscription.date_to)}"
+    else:
+        dates = "любые"
+
+    pickup_city = subscription.pickup_city.title() if subscription.pickup_city else "любой город"
+    delivery_city = subscription.delivery_city.title() if subscription.delivery_city else "любой город"
+
+    return (
+        f"Тип груза: {subscription.cargo_type or 'любой'}\n"
+        f"Вес: {weight}\n"
+        f"Откуда: {pickup_city}\n"
+        f"Куда: {delivery_city}\n"
+        f"Даты загрузки: {dates}"
+    )
+
+
+@buttons.handler("🔔 Подписки", RoleFilter("carrier"))
+async def show_subscriptions(message: Message, state: FSMContext, user: User):
+    await state.clear()
+    subscriptions = await get_carrier_subscriptions(user.user_id)
+
+    if not subscriptions:
+        text = (
+            "🔔 У вас пока нет подписок.\n\n"
+            "Сохраните фильтр, и бот пришлёт новый подходящий заказ сразу после его создания."
+        )
+    else:
+        blocks = [
+            f"<b>#{subscription.sub_id}</b>\n{format_subscription(subscription)}"
+            for subscription in subscriptions
+        ]
+        text = "🔔 <b>Ваши подписки</b>\n\n" + "\n\n".join(blocks)
+
+    await message.answer(text, reply_markup=get_subscriptions_keyboard(subscriptions))
+
+
+@router.callback_query(F.data == "sub_new", RoleFilter("carrier"))
+async def new_subscription(callback: CallbackQuery, state: FSMContext, user: User):
+    if len(await get_carrier_subscriptions(user.user_id)) >= MAX_SUBSCRIPTIONS:
+        await callback.answer(f"Можно сохранить не больше {MAX_SUBSCRIPTIONS} подписок.", show_alert=True)
+        return
+
+    await state.clear()
+    await callback.message.answer(
+        "📦 Какой тип груза вас интересует?",
+        reply_markup=get_subscription_cargo_keyboard()
+    )
+    await state.set_state(SubscriptionStates.waiting_for_cargo_type)
+    await callback.answer()
+
+
+@router.message(SubscriptionStates.waiting_for_cargo_type)
+async def process_subscription_cargo(message: Message, state: FSMContext):
+    if message.text not in CARGO_TYPES:
+        await message.answer(
+            "❌ Пожалуйста, выберите тип груза из предложенных вариантов.",
+            reply_markup=get_subscription_cargo_keyboard()
+        )
+        return
+
+    await state.update_data(cargo_type=CARGO_TYPES[message.text])
+    await message.answer(
+        "⚖️ Укажите диапазон веса в килограммах: \"100-500\", \"от 100\" или \"до 500\".",
+        reply_markup=get_skip_keyboard()
+    )
+    await state.set_state(SubscriptionStates.waiting_for_weight)
+
+
+@router.message(SubscriptionStates.waiting_for_weight)
+async def process_subscription_weight(message: Message, state: FSMContext):
+    if message.text == SKIP:
+        min_weight = max_weight = None
+    else:
+        weight_range = parse_weight_range(message.text)
+        if weight_range is None:
+            await message.answer(
+                "❌ Не удалось разобрать диапазон. Пример: 100-500.",
+                reply_markup=get_skip_keyboard()
+            )
+            return
+        min_weight, max_weight = weight_range
+
+    await state.update_data(min_weight=min_weight, max_weight=max_weight)
+    await message.answer("📍 Город загрузки:", reply_markup=get_skip_keyboard())
+    await state.set_state(SubscriptionStates.waiting_for_pickup_city)
+
+
+async def _read_city(message: Message) -> Tuple[bool, Optional[str]]:
+    if message.text == SKIP:
+        return True, None
+
+    city = normalize_city(message.text)
+    if not city or len(city.split()) > MAX_CITY_WORDS:
+        await message.answer("❌ Укажите только название города.", reply_markup=get_skip_keyboard())
+        return False, None
+    return True, city
+
+
+@router.message(SubscriptionStates.waiting_for_pickup_city)
+async def process_subscription_pickup(message: Message, state: FSMContext):
+    ok, city = await _read_city(message)
+    if not ok:
+        return
+
+    await state.update_data(pickup_city=city)
+    await message.answer("🏁 Город доставки:", reply_markup=get_skip_keyboard())
+    await state.set_state(SubscriptionStates.waiting_for_delivery_city)
+
+
+@router.message(SubscriptionStates.waiting_for_delivery_city)
+async def process_subscription_delivery(message: Message, state: FSMContext):
+    ok, city = await _read_city(message)
+    if not ok:
+        return
+
+    await state.update_data(delivery_city=city)
+    await message.answer(
+        "📅 Даты загрузки в формате ДД.ММ.ГГГГ-ДД.ММ.ГГГГ:",
+        reply_markup=get_skip_keyboard()
+    )
+    await state.set_state(SubscriptionStates.waiting_for_dates)
+
+
+@router.message(SubscriptionStates.waiting_for_dates)
+async def process_subscription_dates(message: Message, state: FSMContext):
+    if message.text == SKIP:
+        date_from = date_to = None
+    else:
+        parts = message.text.split("-")
+        dates = [parse_pickup_date(part) for part in parts]
+        if len(parts) != 2 or None in dates or dates[0] > dates[1]:
+            await message.answer(
+                "❌ Не удалось разобрать даты. Пример: 01.06.2025-15.06.2025.",
+                reply_markup=get_skip_keyboard()
+            )
+            return
+        date_from, date_to = (day.isoformat() for day in dates)
+
+    await state.update_data(date_from=date_from, date_to=date_to)
+    subscription = Subscription(carrier_id=message.from_user.id, **await state.get_data())
+
+    await message.answer(
+        f"🔔 <b>Проверьте подписку:</b>\n\n{format_subscription(subscription)}\n\nСохранить?",
+        reply_markup=get_confirmation_keyboard()
+    )
+    await state.set_state(SubscriptionStates.confirmation)
+
+
+@router.callback_query(SubscriptionStates.confirmation, F.data == "confirm")
+async def confirm_subscription(callback: CallbackQuery, state: FSMContext, user: User):
+    subscription = Subscription(carrier_id=user.user_id, **await state.get_data())
+    subscription.sub_id = await add_subscription(subscription)
+    subscription_index.add(subscription)
+    logger.info(f"Перевозчик {user.user_id} сохранил подписку #{subscription.sub_id}")
+
+    await state.clear()
+    await callback.message.answer(
+        "✅ Подписка сохранена. Мы пришлём подходящие заказы, как только они появятся.",
+        reply_markup=get_main_keyboard(user.role)
+    )
+    await callback.answer()
+
+
+@router.callback_query(SubscriptionStates.confirmation, F.data == "cancel")
+async def cancel_subscription(callback: CallbackQuery, state: FSMContext, user: User):
+    await state.clear()
+    await callback.message.answer("❌ Подписка не сохранена.", reply_markup=get_main_keyboard(user.role))
+    await callback.answer()
+
+
+@callbacks.handler(DeleteSubscription, RoleFilter("carrier"), aliases=("sub_delete",))
+async def remove_subscription(callback: CallbackQuery, callback_data: DeleteSubscription, user: User):
+    sub_id = callback_data.sub_id
+
+    if await delete_subscription(sub_id, user.user_id):
+        subscription_index.remove(sub_id)
+        await callback.message.answer(f"🗑 Подписка #{sub_id} удалена.")
+    else:
+        await callback.message.answer("❌ Подписка не найдена.")
+    await callback.answer()
@@ -0,0 +1,58 @@
+"""Готовые клавиатуры и шаблоны клавиатур заказа.
+
+Разметка aiogram — замороженные pydantic-модели, поэтому статичную
+клавиатуру можно собрать один раз при импорте и отдавать во все ответы.
+Клавиатуры заказа описываются кортежами (текст, callback_data) с
+подстановкой {order_id}: шаблон вычисляется один раз, а на ответ остаётся
+только подставить номер заказа.
+"""
+from enum import Enum
+from functools import wraps
+from typing import Any, Callable, List, Tuple, Type, TypeVar
+
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+
+Markup = TypeVar("Markup")
+
+# Ряд шаблона — кортеж кнопок (текст, callback_data)
+RowTemplate = Tuple[Tuple[str, str], ...]
+KeyboardTemplate = Tuple[RowTemplate, ...]
+
+
+def prebuilt(build: Callable[[], Markup]) -> Callable[[], Markup]:
+    """Собирает клавиатуру при импорте; вызов возвращает один и тот же объект"""
+    markup = build()
+
+    @wraps(build)
+    def get() -> Markup:
+        return markup
+
+    return get
+
+
+def callback_template(schema: Type[CallbackData], **fixed: Any) -> str:
+    """callback_data схемы с заполнителями: callback_template(AcceptOrder) -> "ac1:{order_id}" """
+    parts = [schema.__prefix__]
+    for name in schema.model_fields:
+        if name in fixed:
+            value = fixed[name]
+            parts.append(str(value.value if isinstance(value, Enum) else value))
+        else:
+            parts.append(f"{{{name}}}")
+    return schema.__separator__.join(parts)
+
+
+def render_rows(template: KeyboardTemplate, **values: Any) -> List[List[InlineKeyboardButton]]:
+    return [
+        [
+            InlineKeyboardButton(text=text.format(**values), callback_data=data.format(**values))
+            for text, data in row
+        ]
+        for row in template
+    ]
+
+
+def render(template: KeyboardTemplate, **values: Any) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=render_rows(template, **values))
@@ -1,18 +1,26 @@
 # src/keyboards/delivery_kb.py
 
-from aiogram.utils.keyboard import InlineKeyboardBuilder
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from aiogram.types import InlineKeyboardMarkup
+
+from src.keyboards.cache import KeyboardTemplate, callback_template, render
+from src.utils.callbacks import DeliveryStage, DeliveryStageUpdate
+
+
+def _stage(stage: DeliveryStage) -> str:
+    return callback_template(DeliveryStageUpdate, stage=stage)
+
+
+DELIVERY_STAGES_TEMPLATE: KeyboardTemplate = (
+    (
+        ("🏗 Погрузка началась", _stage(DeliveryStage.loading)),
+        ("🚚 В пути", _stage(DeliveryStage.on_way))
+    ),
+    (
+        ("⏳ Ожидание разгрузки", _stage(DeliveryStage.waiting)),
+        ("✅ Завершено", _stage(DeliveryStage.completed))
+    ),
+)
+
 
 def get_delivery_stages_keyboard(order_id: int) -> InlineKeyboardMarkup:
-    kb = InlineKeyboardBuilder()
-
-    kb.row(
-        InlineKeyboardButton(text="🏗 Погрузка началась", callback_data=f"stage:loading:{order_id}"),
-        InlineKeyboardButton(text="🚚 В пути", callback_data=f"stage:on_way:{order_id}")
-    )
-    kb.row(
-        InlineKeyboardButton(text="⏳ Ожидание разгрузки", callback_data=f"stage:waiting:{order_id}"),
-        InlineKeyboardButton(text="✅ Завершено", callback_data=f"stage:completed:{order_id}")
-    )
-
-    return kb.as_markup()
+    return render(DELIVERY_STAGES_TEMPLATE, order_id=order_id)
@@ -6,8 +6,10 @@ from aiogram.types import (
 )
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 
+from src.keyboards.cache import prebuilt
 
-def get_main_keyboard(user_role: str) -> ReplyKeyboardMarkup:
+
+def _build_main_keyboard(user_role: str) -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
 
     kb.add(KeyboardButton(text="🧑‍💼 Личный кабинет"))
@@ -16,6 +18,7 @@ def get_main_keyboard(user_role: str) -> ReplyKeyboardMarkup:
         kb.add(KeyboardButton(text="📝 Создать заявку"))
     else:
         kb.add(KeyboardButton(text="🔍 Найти заказы"))
+        kb.add(KeyboardButton(text="🔔 Подписки"))
 
     kb.add(KeyboardButton(text="📋 Мои заявки"))
     kb.add(KeyboardButton(text="✏️ Редактировать профиль"))  # ← добавляем сюда
@@ -28,7 +31,15 @@ def get_main_keyboard(user_role: str) -> ReplyKeyboardMarkup:
     )
 
 
+MAIN_KEYBOARDS = {role: _build_main_keyboard(role) for role in ("sender", "carrier")}
+
+
+def get_main_keyboard(user_role: str) -> ReplyKeyboardMarkup:
+    # Любая роль, кроме отправителя, получает меню перевозчика
+    return MAIN_KEYBOARDS["sender" if user_role == "sender" else "carrier"]
+
 
+@prebuilt
 def get_start_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="🚀 Зарегистрироваться"))
@@ -41,6 +52,7 @@ def get_start_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@prebuilt
 def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="❌ Отмена"))
@@ -52,6 +64,7 @@ def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@prebuilt
 def get_back_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="◀️ Назад"))
@@ -63,6 +76,7 @@ def get_back_keyboard() -> ReplyKeyboardMarkup:
     )
 
 
+@prebuilt
 def get_confirmation_keyboard() -> InlineKeyboardMarkup:
     kb = InlineKeyboardBuilder()
     kb.add(InlineKeyboardButton(text="✅ Подтвердить", callback_data="confirm"))
@@ -71,6 +85,7 @@ def get_confirmation_keyboard() -> InlineKeyboardMarkup:
     return kb.as_markup()
 
 
+@prebuilt
 def get_order_actions_keyboard() -> InlineKeyboardMarkup:
     kb = InlineKeyboardBuilder()
     kb.add(InlineKeyboardButton(text="📄 Детали", callback_data="order_details"))
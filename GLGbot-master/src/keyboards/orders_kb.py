@@ -5,6 +5,40 @@ from aiogram.types import (
     InlineKeyboardButton
 )
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
+from functools import lru_cache
+from typing import Dict, List
+
+from src.keyboards.cache import KeyboardTemplate, callback_template, prebuilt, render, render_rows
+
+from src.utils.callbacks import (
+    AcceptOrder,
+    ConfirmDelivery,
+    MarkDelivered,
+    MyOrders,
+    MyOrdersSummary,
+    OrdersPage,
+    ViewDocuments,
+    ViewOrder
+)
+from src.utils.helpers import get_status_emoji, get_status_text
+
+
+ACCEPT_ORDER = callback_template(AcceptOrder)
+VIEW_ORDER = callback_template(ViewOrder)
+MARK_DELIVERED = callback_template(MarkDelivered)
+CONFIRM_DELIVERY = callback_template(ConfirmDelivery)
+VIEW_DOCUMENTS = callback_template(ViewDocuments)
+
+ACCEPT_ORDER_TEMPLATE: KeyboardTemplate = (
+    (("✅ Принять заказ", ACCEPT_ORDER), ("👁️ Подробнее", VIEW_ORDER)),
+)
+AVAILABLE_ORDER_TEMPLATE: KeyboardTemplate = (
+    (("✅ Принять #{order_id}", ACCEPT_ORDER), ("👁️ #{order_id}", VIEW_ORDER)),
+)
+MY_ORDER_TEMPLATE: KeyboardTemplate = (
+    (("📦 Заказ #{order_id}", VIEW_ORDER),),
+)
+
 
 def get_delivery_action_keyboard(order_id: int) -> InlineKeyboardMarkup:
     kb = InlineKeyboardBuilder()
@@ -16,6 +50,7 @@ def get_delivery_action_keyboard(order_id: int) -> InlineKeyboardMarkup:
 
     return kb.as_markup()
 
+@prebuilt
 def get_cargo_type_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="📦 Стандартный"))
@@ -27,6 +62,7 @@ def get_cargo_type_keyboard() -> ReplyKeyboardMarkup:
     return kb.as_markup(resize_keyboard=True)
 
 
+@prebuilt
 def get_document_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="📎 Добавить документ"))
@@ -37,76 +73,112 @@ def get_document_keyboard() -> ReplyKeyboardMarkup:
 
 
 def get_accept_order_keyboard(order_id: int) -> InlineKeyboardMarkup:
-    kb = InlineKeyboardBuilder()
-    kb.add(InlineKeyboardButton(
-        text="✅ Принять заказ", 
-        callback_data=f"accept_order:{order_id}"
-    ))
-    kb.add(InlineKeyboardButton(
-        text="👁️ Подробнее", 
-        callback_data=f"view_order:{order_id}"
-    ))
-    
-    return kb.as_markup()
+    return render(ACCEPT_ORDER_TEMPLATE, order_id=order_id)
 
 
-def get_order_details_keyboard(order_id: int, status: str, user_role: str) -> InlineKeyboardMarkup:
-    kb = InlineKeyboardBuilder()
+@lru_cache(maxsize=64)
+def order_details_template(status: str, user_role: str) -> KeyboardTemplate:
+    """Набор кнопок зависит только от статуса и роли, order_id подставляется при сборке"""
+    buttons = []
     
     if status == "new" and user_role == "carrier":
-        kb.add(InlineKeyboardButton(
-            text="✅ Принять заказ", 
-            callback_data=f"accept_order:{order_id}"
-        ))
+        buttons.append(("✅ Принять заказ", ACCEPT_ORDER))
     
     if status == "accepted" and user_role == "carrier":
-        kb.add(InlineKeyboardButton(
-            text="🚚 Отметить как доставленный", 
-            callback_data=f"mark_delivered:{order_id}"
-        ))
+        buttons.append(("🚚 Отметить как доставленный", MARK_DELIVERED))
     
     if status == "delivered" and user_role == "sender":
-        kb.add(InlineKeyboardButton(
-            text="🏁 Подтвердить получение", 
-            callback_data=f"confirm_delivery:{order_id}"
+        buttons.append(("🏁 Подтвердить получение", CONFIRM_DELIVERY))
+    
+    buttons.append(("📎 Документы", VIEW_DOCUMENTS))
+    buttons.append(("◀️ Назад", "back_to_orders"))
+    
+    return (tuple(buttons),)
+
+
+def get_order_details_keyboard(order_id: int, status: str, user_role: str) -> InlineKeyboardMarkup:
+    return render(order_details_template(status, user_role), order_id=order_id)
+
+
+def get_available_orders_keyboard(
+    order_ids: List[int],
+    page: int,
+    total_pages: int,
+    first_cursor: str,
+    last_cursor: str
+) -> InlineKeyboardMarkup:
+    rows = []
+    for order_id in order_ids:
+        rows.extend(render_rows(AVAILABLE_ORDER_TEMPLATE, order_id=order_id))
+    
+    if total_pages > 1:
+        navigation = []
+        if page > 1:
+            prev_data = (
+                OrdersPage(page=1) if page == 2
+                else OrdersPage(page=page - 1, direction="p", cursor=first_cursor)
+            )
+            navigation.append(InlineKeyboardButton(text="◀️ Назад", callback_data=prev_data.pack()))
+        
+        navigation.append(InlineKeyboardButton(
+            text=f"Страница {page}/{total_pages}", 
+            callback_data="current_page"
         ))
+        
+        if page < total_pages:
+            navigation.append(InlineKeyboardButton(
+                text="▶️ Вперед", 
+                callback_data=OrdersPage(page=page + 1, direction="n", cursor=last_cursor).pack()
+            ))
+        rows.append(navigation)
     
-    kb.add(InlineKeyboardButton(
-        text="📎 Документы", 
-        callback_data=f"view_documents:{order_id}"
-    ))
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+def get_my_orders_summary_keyboard(counts: Dict[str, int]) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardBuilder()
     
-    kb.add(InlineKeyboardButton(
-        text="◀️ Назад", 
-        callback_data="back_to_orders"
-    ))
+    for status, count in counts.items():
+        kb.button(
+            text=f"{get_status_emoji(status)} {get_status_text(status)} ({count})",
+            callback_data=MyOrders(status=status, page=1).pack()
+        )
+    kb.adjust(2)
     
     return kb.as_markup()
 
 
-def get_orders_navigation_keyboard(page: int, total_pages: int) -> InlineKeyboardMarkup:
-    kb = InlineKeyboardBuilder()
+def get_my_orders_page_keyboard(
+    order_ids: List[int],
+    status: str,
+    page: int,
+    total_pages: int
+) -> InlineKeyboardMarkup:
+    rows = []
+    for order_id in order_ids:
+        rows.extend(render_rows(MY_ORDER_TEMPLATE, order_id=order_id))
     
+    navigation = []
     if page > 1:
-        kb.add(InlineKeyboardButton(
-            text="◀️ Назад", 
-            callback_data=f"orders_page:{page-1}"
+        navigation.append(InlineKeyboardButton(
+            text="◀️", 
+            callback_data=MyOrders(status=status, page=page - 1).pack()
         ))
-    
-    kb.add(InlineKeyboardButton(
-        text=f"Страница {page}/{total_pages}", 
-        callback_data="current_page"
+    navigation.append(InlineKeyboardButton(
+        text="📋 К сводке", 
+        callback_data=MyOrdersSummary().pack()
     ))
-    
     if page < total_pages:
-        kb.add(InlineKeyboardButton(
-            text="▶️ Вперед", 
-            callback_data=f"orders_page:{page+1}"
+        navigation.append(InlineKeyboardButton(
+            text="▶️", 
+            callback_data=MyOrders(status=status, page=page + 1).pack()
         ))
+    rows.append(navigation)
     
-    return kb.as_markup()
+    return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
+@prebuilt
 def get_skip_keyboard():
     """Возвращает клавиатуру с кнопкой 'Пропустить'"""
     builder = InlineKeyboardBuilder()
@@ -116,6 +188,7 @@ def get_skip_keyboard():
     return builder.as_markup()
 
 
+@prebuilt
 def get_create_order_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="📝 Создать заявку"))
@@ -124,6 +197,7 @@ def get_create_order_keyboard() -> ReplyKeyboardMarkup:
     return kb.as_markup(resize_keyboard=True)
 
 
+@prebuilt
 def get_confirm_order_keyboard() -> InlineKeyboardMarkup:
     kb = InlineKeyboardBuilder()
     kb.button(text="✅ Подтвердить", callback_data="confirm_order")
@@ -133,6 +207,7 @@ def get_confirm_order_keyboard() -> InlineKeyboardMarkup:
     return kb.as_markup()
 
 
+@prebuilt
 def get_cancel_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="❌ Отмена"))
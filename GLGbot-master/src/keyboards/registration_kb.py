@@ -6,7 +6,10 @@ from aiogram.types import (
 )
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 
+from src.keyboards.cache import prebuilt
 
+
+@prebuilt
 def get_role_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="📦 Я отправитель"))
@@ -16,6 +19,7 @@ def get_role_keyboard() -> ReplyKeyboardMarkup:
     return kb.as_markup(resize_keyboard=True)
 
 
+@prebuilt
 def get_skip_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="⏭️ Пропустить"))
@@ -24,6 +28,7 @@ def get_skip_keyboard() -> ReplyKeyboardMarkup:
     return kb.as_markup(resize_keyboard=True)
 
 
+@prebuilt
 def get_phone_keyboard() -> ReplyKeyboardMarkup:
     kb = ReplyKeyboardBuilder()
     kb.add(KeyboardButton(text="📱 Отправить телефон", request_contact=True))
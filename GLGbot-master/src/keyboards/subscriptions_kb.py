@@ -0,0 +1,39 @@
+from aiogram.types import (
+    ReplyKeyboardMarkup,
+    KeyboardButton,
+    InlineKeyboardMarkup,
+    InlineKeyboardButton
+)
+from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
+from typing import List
+
+from src.database.models import Subscription
+from src.keyboards.cache import prebuilt
+from src.utils.callbacks import DeleteSubscription
+
+
+@prebuilt
+def get_subscription_cargo_keyboard() -> ReplyKeyboardMarkup:
+    kb = ReplyKeyboardBuilder()
+    kb.add(KeyboardButton(text="📦 Стандартный"))
+    kb.add(KeyboardButton(text="📏 Негабаритный"))
+    kb.add(KeyboardButton(text="🔶 Хрупкий"))
+    kb.add(KeyboardButton(text="🔒 Ценный"))
+    kb.add(KeyboardButton(text="🌐 Любой"))
+    kb.add(KeyboardButton(text="❌ Отмена"))
+    kb.adjust(2)
+    
+    return kb.as_markup(resize_keyboard=True)
+
+
+def get_subscriptions_keyboard(subscriptions: List[Subscription]) -> InlineKeyboardMarkup:
+    kb = InlineKeyboardBuilder()
+    
+    for subscription in subscriptions:
+        kb.row(InlineKeyboardButton(
+            text=f"🗑 Удалить подписку #{subscription.sub_id}",
+            callback_data=DeleteSubscription(sub_id=subscription.sub_id).pack()
+        ))
+    kb.row(InlineKeyboardButton(text="➕ Новая подписка", callback_data="sub_new"))
+    
+    return kb.as_markup()
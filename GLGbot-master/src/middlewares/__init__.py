@@ -1,8 +1,21 @@
-from aiogram import Dispatcher
+from aiogram import Bot, Dispatcher
 
+from src.config import config
 from src.middlewares.auth import AuthMiddleware
+from src.middlewares.outbound import FloodControlMiddleware, OutboundContextMiddleware
+from src.utils.stats import register_stats
 
 
-def register_all_middlewares(dp: Dispatcher):
-    dp.message.middleware(AuthMiddleware())
-    dp.callback_query.middleware(AuthMiddleware())
+def register_all_middlewares(dp: Dispatcher, bot: Bot):
+    # outer-middleware на update: пользователь нужен уже на этапе фильтров
+    dp.update.outer_middleware(AuthMiddleware())
+    dp.update.outer_middleware(OutboundContextMiddleware())
+
+    flood_control = FloodControlMiddleware(
+        global_rate=config.outbound.global_rate,
+        chat_rate=config.outbound.chat_rate,
+        chat_burst=config.outbound.chat_burst,
+        max_retries=config.outbound.max_retries,
+    )
+    bot.session.middleware(flood_control)
+    register_stats("outbound", flood_control.stats)
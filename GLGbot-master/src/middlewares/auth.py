@@ -1,28 +1,22 @@
 from typing import Any, Awaitable, Callable, Dict
 from aiogram import BaseMiddleware
-from aiogram.types import Message, CallbackQuery
-from aiogram.fsm.context import FSMContext
-from aiogram.dispatcher.flags import get_flag
+from aiogram.types import TelegramObject, User as TelegramUser
 
 from src.database.crud import get_user
 from src.config import logger
 
 
 class AuthMiddleware(BaseMiddleware):
+    """Загружает пользователя из БД один раз на апдейт и кладёт в data["user"]."""
+
     async def __call__(
         self,
-        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
-        event: Message | CallbackQuery,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
-        need_auth = get_flag(data, "auth")
-        
-        if need_auth is None or need_auth is False:
-            return await handler(event, data)
-        
-        user_id = event.from_user.id
+        from_user: TelegramUser | None = data.get("event_from_user")
         
-        user = await get_user(user_id)
-        data["user"] = user
+        data["user"] = await get_user(from_user.id) if from_user else None
         
         return await handler(event, data)
@@ -0,0 +1,200 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from src.config import config, logger
+from src.database.crud import (
+    get_document,
+    get_unprocessed_document_ids,
+    mark_document_processed,
+    set_document_image,
+    set_document_pdf
+)
+from src.database.models import Document
+from src.services.processing import process_image, process_pdf
+from src.utils.stats import register_stats
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff"}
+
+
+def is_image(document: Document) -> bool:
+    return (
+        document.file_type == "photo"
+        or os.path.splitext(document.file_path)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def is_pdf(document: Document) -> bool:
+    return os.path.splitext(document.file_path)[1].lower() == ".pdf"
+
+
+def derived_path(document: Document, suffix: str) -> str:
+    """Производные файлы лежат рядом с блобом: <hash>.thumb.jpg"""
+    return f"{os.path.splitext(document.file_path)[0]}.{suffix}.jpg"
+
+
+class DocumentPipeline:
+    """Фоновая обработка загруженных документов в пуле процессов.
+
+    Обработчик загрузки только ставит doc_id в очередь и сразу отвечает
+    пользователю. Воркеры берут документы из очереди и отдают тяжёлую
+    работу (Pillow, PyMuPDF) в отдельные процессы, чтобы не держать цикл событий
+    и GIL. Необработанные документы отмечены processed_at IS NULL и при
+    перезапуске снова попадают в очередь.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks = []
+        self._pending = set()
+        self._in_progress = 0
+        self._processed = 0
+        self._failed = 0
+        self._dropped = 0
+
+    async def start(self):
+        # fork копировал бы процесс вместе с потоками aiosqlite и пула файлов
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+        backlog = await get_unprocessed_document_ids(self.queue.maxsize)
+        for doc_id in backlog:
+            self.submit(doc_id)
+        if backlog:
+            logger.info(f"В очередь обработки возвращено документов: {len(backlog)}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, doc_id: int):
+        if doc_id in self._pending:
+            return
+        try:
+            self.queue.put_nowait(doc_id)
+        except asyncio.QueueFull:
+            # Документ останется необработанным и вернётся в очередь при перезапуске
+            self._dropped += 1
+            logger.warning(f"Очередь обработки документов переполнена, документ #{doc_id} отложен")
+            return
+
+        self._pending.add(doc_id)
+        depth = self.queue.qsize()
+        if depth >= self.queue.maxsize // 2:
+            logger.warning(f"Очередь обработки документов: {depth} из {self.queue.maxsize}")
+
+    async def _worker(self):
+        while True:
+            doc_id = await self.queue.get()
+            self._in_progress += 1
+            try:
+                await self._process(doc_id)
+                self._processed += 1
+            except Exception as e:
+                self._failed += 1
+                logger.error(f"Ошибка обработки документа #{doc_id}: {e}")
+                # Битый файл не должен возвращаться в очередь при каждом запуске
+                try:
+                    await mark_document_processed(doc_id)
+                except Exception as e:
+                    logger.error(f"Не удалось отметить документ #{doc_id} обработанным: {e}")
+            finally:
+                self._pending.discard(doc_id)
+                self._in_progress -= 1
+                self.queue.task_done()
+
+    async def _process(self, doc_id: int):
+        document = await get_document(doc_id)
+        if not document:
+            return
+
+        if is_pdf(document):
+            await self._process_pdf(document)
+            return
+
+        if not is_image(document):
+            await mark_document_processed(doc_id)
+            return
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._executor,
+            process_image,
+            document.file_path,
+            derived_path(document, "normal"),
+            derived_path(document, "thumb"),
+            config.media.image_max_side,
+            config.media.image_quality,
+            config.media.thumbnail_side,
+            config.media.thumbnail_quality,
+        )
+        await set_document_image(doc_id, **result)
+        logger.info(
+            f"Изображение #{doc_id} обработано: {result['width']}x{result['height']}, "
+            f"в очереди {self.queue.qsize()}"
+        )
+
+    async def _process_pdf(self, document: Document):
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._executor,
+            process_pdf,
+            document.file_path,
+            derived_path(document, "preview"),
+            derived_path(document, "thumb"),
+            config.media.pdf_preview_side,
+            config.media.pdf_preview_quality,
+            config.media.thumbnail_side,
+            config.media.thumbnail_quality,
+            config.media.pdf_text_limit,
+        )
+        await set_document_pdf(document.doc_id, **result)
+        logger.info(
+            f"PDF #{document.doc_id} обработан: {result['page_count']} стр., "
+            f"в очереди {self.queue.qsize()}"
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.queue.qsize(),
+            "in_progress": self._in_progress,
+            "processed": self._processed,
+            "failed": self._failed,
+            "dropped": self._dropped,
+        }
+
+
+_pipeline: Optional[DocumentPipeline] = None
+
+
+async def start_document_pipeline():
+    global _pipeline
+    _pipeline = DocumentPipeline(config.media.workers, config.media.queue_size)
+    register_stats("documents", _pipeline.stats)
+    await _pipeline.start()
+
+
+async def stop_document_pipeline():
+    global _pipeline
+    if _pipeline is not None:
+        await _pipeline.stop()
+        _pipeline = None
+
+
+def get_document_pipeline() -> DocumentPipeline:
+    if _pipeline is None:
+        raise RuntimeError("Обработка документов не запущена")
+    return _pipeline
@@ -0,0 +1,82 @@
+"""Уведомления о событиях заказа.
+
+Функции только строят записи для outbox: crud сохраняет их в одной
+транзакции со сменой статуса, а доставляет OutboxWorker.
+"""
+from typing import List
+
+from src.database.models import Notification, Order, User
+from src.keyboards.orders_kb import get_accept_order_keyboard
+from src.services.subscriptions import subscription_index
+from src.utils.helpers import format_order_info
+
+
+def new_order_notifications(order: Order) -> List[Notification]:
+    """Новый заказ всем перевозчикам, чьим подпискам он подходит"""
+    carriers = subscription_index.match(order)
+    if not carriers:
+        return []
+
+    text = "🔔 <b>Новый заказ по вашей подписке</b>\n\n" + format_order_info(
+        order.order_id,
+        order.cargo_type,
+        order.weight,
+        order.pickup_address,
+        order.delivery_address,
+        order.pickup_date,
+        order.dimensions
+    )
+    keyboard = get_accept_order_keyboard(order.order_id).model_dump_json(exclude_none=True)
+
+    return [
+        Notification(
+            chat_id=carrier_id,
+            text=text,
+            dedup_key=f"order:{order.order_id}:match:{carrier_id}",
+            reply_markup=keyboard
+        )
+        for carrier_id in carriers
+    ]
+
+
+def order_accepted_notifications(order: Order, carrier: User) -> List[Notification]:
+    return [
+        Notification(
+            chat_id=order.sender_id,
+            text=(
+                f"🎉 Ваш заказ #{order.order_id} был принят перевозчиком!\n\n"
+                f"Данные перевозчика:\n"
+                f"Имя: {carrier.full_name}\n"
+                f"Телефон: {carrier.phone}\n"
+                f"Email: {carrier.email or 'Не указан'}\n\n"
+                f"Вы можете связаться с ним для уточнения деталей."
+            ),
+            dedup_key=f"order:{order.order_id}:accepted"
+        )
+    ]
+
+
+def order_delivered_notifications(order: Order) -> List[Notification]:
+    return [
+        Notification(
+            chat_id=order.sender_id,
+            text=(
+                f"🚚 Перевозчик отметил заказ #{order.order_id} как доставленный.\n"
+                f"Пожалуйста, подтвердите получение груза."
+            ),
+            dedup_key=f"order:{order.order_id}:delivered"
+        )
+    ]
+
+
+def order_completed_notifications(order: Order) -> List[Notification]:
+    return [
+        Notification(
+            chat_id=order.carrier_id,
+            text=(
+                f"🎉 Отправитель подтвердил получение заказа #{order.order_id}.\n"
+                f"Заказ успешно завершен!"
+            ),
+            dedup_key=f"order:{order.order_id}:completed"
+        )
+    ]
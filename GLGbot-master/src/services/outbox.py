@@ -0,0 +1,168 @@
+import asyncio
+import os
+import random
+import socket
+import time
+from typing import Dict, Optional
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+    TelegramUnauthorizedError
+)
+from aiogram.types import InlineKeyboardMarkup
+
+from src.config import OutboxConfig, config, logger
+from src.database.crud import (
+    claim_due_notifications,
+    mark_notification_failed,
+    mark_notification_sent,
+    reschedule_notification
+)
+from src.database.models import Notification
+from src.utils.stats import register_stats
+
+
+# Повтор этих ошибок ничего не изменит: бот заблокирован, чата нет, сообщение битое
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest, TelegramNotFound)
+
+
+class OutboxWorker:
+    """Доставка уведомлений из таблицы outbox.
+
+    Обработчики пишут уведомления в outbox в той же транзакции, что и смену
+    статуса заказа, и сразу отвечают пользователю. Воркер забирает готовые
+    к отправке записи, а при временной ошибке переносит попытку с
+    экспоненциальной задержкой. Запись, которую доставить невозможно или
+    не удалось за max_attempts попыток, помечается 'failed' и остаётся в
+    таблице вместе с последней ошибкой. Записи забираются с пометкой
+    воркера, так что при нескольких процессах бота каждое уведомление
+    отправляет один из них.
+    """
+
+    def __init__(self, bot: Bot, settings: OutboxConfig):
+        self.bot = bot
+        self.settings = settings
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sent = 0
+        self._retried = 0
+        self._failed = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                delivered = await self.deliver_due()
+            except Exception as e:
+                logger.error(f"Ошибка обработки очереди уведомлений: {e}")
+                delivered = 0
+
+            # Полная пачка: возможно, в очереди есть ещё, не ждём
+            if delivered >= self.settings.batch_size:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.settings.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def deliver_due(self) -> int:
+        notifications = await claim_due_notifications(
+            self.worker_id, time.time(), self.settings.batch_size, self.settings.claim_timeout
+        )
+        # Скорость отправки ограничивает сессия бота, здесь только параллелим ожидание
+        await asyncio.gather(*(self._deliver(n) for n in notifications))
+        return len(notifications)
+
+    async def _deliver(self, notification: Notification):
+        reply_markup = None
+        if notification.reply_markup:
+            reply_markup = InlineKeyboardMarkup.model_validate_json(notification.reply_markup)
+
+        attempts = notification.attempts + 1
+        try:
+            await self.bot.send_message(notification.chat_id, notification.text, reply_markup=reply_markup)
+        except TelegramUnauthorizedError:
+            # Неверный токен касается всех сообщений: ждём, пока бот не будет остановлен
+            raise
+        except PERMANENT_ERRORS as e:
+            await self._fail(notification, attempts, e)
+        except TelegramRetryAfter as e:
+            await self._retry(notification, attempts, e, e.retry_after)
+        except Exception as e:
+            if attempts >= self.settings.max_attempts:
+                await self._fail(notification, attempts, e)
+            else:
+                await self._retry(notification, attempts, e, self._backoff(attempts))
+        else:
+            await mark_notification_sent(notification.notification_id, attempts)
+            self._sent += 1
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.settings.base_delay * 2 ** (attempts - 1), self.settings.max_delay)
+        # Разброс, чтобы после сбоя сети повторы не ушли одной пачкой
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _retry(self, notification: Notification, attempts: int, error: Exception, delay: float):
+        await reschedule_notification(notification.notification_id, attempts, time.time() + delay, str(error))
+        self._retried += 1
+        logger.warning(
+            f"Уведомление #{notification.notification_id} не доставлено (попытка {attempts}), "
+            f"повтор через {delay:.1f} с: {error}"
+        )
+
+    async def _fail(self, notification: Notification, attempts: int, error: Exception):
+        await mark_notification_failed(notification.notification_id, attempts, str(error))
+        self._failed += 1
+        logger.error(
+            f"Уведомление #{notification.notification_id} для чата {notification.chat_id} "
+            f"не доставлено окончательно после {attempts} попыток: {error}"
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "sent": self._sent,
+            "retried": self._retried,
+            "failed": self._failed,
+        }
+
+
+_worker: Optional[OutboxWorker] = None
+
+
+def start_outbox_worker(bot: Bot):
+    global _worker
+    _worker = OutboxWorker(bot, config.outbox)
+    register_stats("outbox", _worker.stats)
+    _worker.start()
+
+
+async def stop_outbox_worker():
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+def wake_outbox():
+    """Будит воркер после коммита: уведомление уходит сразу, а не через poll_interval"""
+    if _worker is not None:
+        _worker.wake()
@@ -0,0 +1,99 @@
+"""Обработка файлов в дочерних процессах пула.
+
+Функции здесь выполняются вне процесса бота, поэтому принимают и
+возвращают только простые значения и не трогают БД и aiogram.
+"""
+import os
+from typing import Any, Dict
+
+import pymupdf
+from PIL import Image, ImageOps
+
+
+def _save_jpeg(image: Image.Image, path: str, quality: int):
+    # Пишем во временный файл: прерванная обработка не оставит битый результат,
+    # а два процесса с одинаковым содержимым не помешают друг другу
+    tmp_path = f"{path}.{os.getpid()}.part"
+    image.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+
+def process_image(
+    source_path: str,
+    normalized_path: str,
+    thumbnail_path: str,
+    max_side: int,
+    quality: int,
+    thumbnail_side: int,
+    thumbnail_quality: int,
+) -> Dict[str, Any]:
+    """Сжатая копия и миниатюра без EXIF.
+
+    Поворот из EXIF применяется к пикселям до сохранения, поэтому фото
+    с телефона не "ложатся на бок", а координаты и модель камеры
+    в результаты не попадают.
+    """
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        width, height = image.size
+
+        # Одинаковый контент даёт те же пути: готовые файлы не пересчитываем
+        if not os.path.exists(normalized_path):
+            normalized = image.copy()
+            normalized.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            _save_jpeg(normalized, normalized_path, quality)
+
+        if not os.path.exists(thumbnail_path):
+            thumbnail = image.copy()
+            thumbnail.thumbnail((thumbnail_side, thumbnail_side), Image.Resampling.LANCZOS)
+            _save_jpeg(thumbnail, thumbnail_path, thumbnail_quality)
+
+    return {
+        "width": width,
+        "height": height,
+        "normalized_path": normalized_path,
+        "thumbnail_path": thumbnail_path,
+    }
+
+
+def process_pdf(
+    source_path: str,
+    preview_path: str,
+    thumbnail_path: str,
+    preview_side: int,
+    preview_quality: int,
+    thumbnail_side: int,
+    thumbnail_quality: int,
+    text_limit: int,
+) -> Dict[str, Any]:
+    """Число страниц, текст, превью и миниатюра первой страницы PDF.
+
+    Превью идёт в медиагруппу документов, миниатюра — в карточку заказа,
+    как у изображений. Страница отрисовывается один раз, миниатюра
+    уменьшается из превью.
+    """
+    with pymupdf.open(source_path) as pdf:
+        page_count = pdf.page_count
+        first_page = pdf[0]
+        text = first_page.get_text().strip()[:text_limit]
+
+        if not os.path.exists(preview_path) or not os.path.exists(thumbnail_path):
+            zoom = preview_side / max(first_page.rect.width, first_page.rect.height)
+            pixmap = first_page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+            if not os.path.exists(preview_path):
+                _save_jpeg(image, preview_path, preview_quality)
+
+            if not os.path.exists(thumbnail_path):
+                image.thumbnail((thumbnail_side, thumbnail_side), Image.Resampling.LANCZOS)
+                _save_jpeg(image, thumbnail_path, thumbnail_quality)
+
+    return {
+        "page_count": page_count,
+        "first_page_text": text,
+        "preview_path": preview_path,
+        "thumbnail_path": thumbnail_path,
+    }
@@ -0,0 +1,183 @@
+import asyncio
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from src.config import config, logger
+from src.database.crud import get_all_subscriptions, get_subscription_ids, get_subscriptions_by_ids
+from src.database.models import Order, Subscription
+from src.utils.helpers import parse_pickup_date
+
+
+# Границы корзин по весу, кг. Подписка лежит во всех корзинах, которые
+# пересекает её диапазон; шкала логарифмическая, так что корзин немного
+WEIGHT_BOUNDS = (0, 10, 50, 100, 250, 500, 1000, 2000, 5000, 10000, 20000, 40000)
+MAX_CITY_WORDS = 4
+
+BucketKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def normalize_city(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower().replace("ё", "е")))
+
+
+def address_phrases(address: str, max_words: int) -> Set[str]:
+    """Все фразы адреса до max_words слов: так город ищется по словарю, а не перебором"""
+    words = normalize_city(address).split()
+    return {
+        " ".join(words[i:i + n])
+        for n in range(1, max_words + 1)
+        for i in range(len(words) - n + 1)
+    }
+
+
+def _weight_bins(min_weight: Optional[float], max_weight: Optional[float]) -> range:
+    first = bisect_right(WEIGHT_BOUNDS, min_weight or 0) - 1
+    last = len(WEIGHT_BOUNDS) - 1 if max_weight is None else bisect_right(WEIGHT_BOUNDS, max_weight) - 1
+    return range(max(first, 0), last + 1)
+
+
+def _count_words(counter: Dict[int, int], city: Optional[str], delta: int):
+    if not city:
+        return
+    words = len(city.split())
+    counter[words] += delta
+    if not counter[words]:
+        del counter[words]
+
+
+class SubscriptionIndex:
+    """Индекс сохранённых фильтров перевозчиков в памяти.
+
+    Подписки разложены по корзинам (тип груза, город загрузки, город
+    доставки), где None означает "любой", а внутри корзины — по интервалам
+    веса. Для нового заказа корзины ищутся по словарю среди фраз его адресов,
+    и в каждой найденной берётся одна весовая ячейка, так что точный вес
+    и даты сверяются только с малой долей подписчиков.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._buckets: Dict[BucketKey, Dict[int, Set[int]]] = defaultdict(dict)
+        # Сколько подписок задают город из N слов: длиннее фразы адреса не строим
+        self._pickup_words: Dict[int, int] = defaultdict(int)
+        self._delivery_words: Dict[int, int] = defaultdict(int)
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def load(self, subscriptions: Iterable[Subscription]):
+        for subscription in subscriptions:
+            self.add(subscription)
+
+    def ids(self) -> Set[int]:
+        return set(self._subscriptions)
+
+    def add(self, subscription: Subscription):
+        if subscription.sub_id in self._subscriptions:
+            self.remove(subscription.sub_id)
+
+        self._subscriptions[subscription.sub_id] = subscription
+        bins = self._buckets[self._key(subscription)]
+        for i in _weight_bins(subscription.min_weight, subscription.max_weight):
+            bins.setdefault(i, set()).add(subscription.sub_id)
+        _count_words(self._pickup_words, subscription.pickup_city, 1)
+        _count_words(self._delivery_words, subscription.delivery_city, 1)
+
+    def remove(self, sub_id: int):
+        subscription = self._subscriptions.pop(sub_id, None)
+        if subscription is None:
+            return
+
+        key = self._key(subscription)
+        bins = self._buckets[key]
+        for i in _weight_bins(subscription.min_weight, subscription.max_weight):
+            bins[i].discard(sub_id)
+            if not bins[i]:
+                del bins[i]
+        if not bins:
+            del self._buckets[key]
+        _count_words(self._pickup_words, subscription.pickup_city, -1)
+        _count_words(self._delivery_words, subscription.delivery_city, -1)
+
+    def match(self, order: Order) -> Set[int]:
+        """carrier_id всех перевозчиков, чьим фильтрам подходит заказ"""
+        if not self._subscriptions:
+            return set()
+
+        pickup_cities = [
+            None, *address_phrases(order.pickup_address, max(self._pickup_words, default=0))
+        ]
+        delivery_cities = [
+            None, *address_phrases(order.delivery_address, max(self._delivery_words, default=0))
+        ]
+        pickup_date = parse_pickup_date(order.pickup_date)
+        day = pickup_date.isoformat() if pickup_date else None
+        weight_bin = bisect_right(WEIGHT_BOUNDS, order.weight) - 1
+
+        carriers = set()
+        for cargo_type in (order.cargo_type, None):
+            for pickup_city in pickup_cities:
+                for delivery_city in delivery_cities:
+                    bins = self._buckets.get((cargo_type, pickup_city, delivery_city))
+                    if not bins:
+                        continue
+                    for sub_id in bins.get(weight_bin, ()):
+                        subscription = self._subscriptions[sub_id]
+                        if subscription.carrier_id in carriers:
+                            continue
+                        if subscription.min_weight is not None and order.weight < subscription.min_weight:
+                            continue
+                        if subscription.max_weight is not None and order.weight > subscription.max_weight:
+                            continue
+                        if subscription.date_from or subscription.date_to:
+                            if day is None:
+                                continue
+                            if subscription.date_from and day < subscription.date_from:
+                                continue
+                            if subscription.date_to and day > subscription.date_to:
+                                continue
+                        carriers.add(subscription.carrier_id)
+
+        return carriers
+
+    @staticmethod
+    def _key(subscription: Subscription) -> BucketKey:
+        return subscription.cargo_type, subscription.pickup_city, subscription.delivery_city
+
+
+subscription_index = SubscriptionIndex()
+
+
+async def load_subscription_index():
+    subscription_index.load(await get_all_subscriptions())
+    logger.info(f"Загружено подписок перевозчиков: {len(subscription_index)}")
+
+
+async def refresh_subscription_index():
+    """Сверяет индекс с БД: подписки могли добавить или удалить другие процессы бота.
+
+    Подписки не изменяются, а sub_id не переиспользуются, поэтому достаточно
+    сравнить наборы номеров и дочитать только новые строки — полная
+    пересборка на сотне тысяч подписок заняла бы цикл событий на секунду.
+    """
+    known = subscription_index.ids()
+    stored = await get_subscription_ids()
+    for sub_id in known - stored:
+        subscription_index.remove(sub_id)
+
+    # Подписки, добавленные этим процессом за время запроса, уже в индексе
+    added = stored - subscription_index.ids()
+    if added:
+        for subscription in await get_subscriptions_by_ids(added):
+            subscription_index.add(subscription)
+
+
+async def subscription_refresh_loop():
+    while True:
+        await asyncio.sleep(config.subscription_refresh_interval)
+        try:
+            await refresh_subscription_index()
+        except Exception as e:
+            logger.error(f"Ошибка обновления индекса подписок: {e}")
@@ -0,0 +1,36 @@
+from aiogram.fsm.storage.base import BaseEventIsolation, BaseStorage, DefaultKeyBuilder
+from aiogram.fsm.storage.memory import DisabledEventIsolation, MemoryStorage
+
+from src.config import config
+from src.storage.sqlite import SQLiteStorage
+
+
+def create_storage() -> BaseStorage:
+    if config.fsm.storage == "sqlite":
+        return SQLiteStorage(
+            config.fsm.flush_interval,
+            config.fsm.idle_ttl,
+            config.fsm.max_contexts,
+        )
+    if config.fsm.storage == "memory":
+        return MemoryStorage()
+    if config.fsm.storage == "redis":
+        # Общее хранилище для нескольких процессов бота, нужен пакет redis
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        return RedisStorage.from_url(
+            config.fsm.redis_url,
+            key_builder=DefaultKeyBuilder(with_bot_id=True, with_destiny=True),
+        )
+    raise ValueError(f"Неизвестное FSM-хранилище: {config.fsm.storage}")
+
+
+def create_events_isolation(storage: BaseStorage) -> BaseEventIsolation:
+    """Блокировка апдейтов одного пользователя.
+
+    Для Redis блокировка общая для всех процессов, иначе два воркера могут
+    одновременно обработать шаги одного мастера и затереть данные друг друга.
+    """
+    if config.fsm.storage == "redis":
+        return storage.create_isolation()
+    return DisabledEventIsolation()
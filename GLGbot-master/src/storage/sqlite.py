@@ -0,0 +1,279 @@
+import asyncio
+import heapq
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from aiogram.exceptions import DataNotDictLikeError
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+
+from src.config import logger
+from src.database.db import get_db
+
+
+@dataclass(slots=True)
+class FsmRecord:
+    state: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    payload: str = "{}"
+    expires_at: float = 0.0
+
+    @property
+    def is_empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM-хранилище в БД бота с кэшем в памяти и отложенной записью.
+
+    Чтение идёт из памяти (при промахе запись один раз подгружается из БД),
+    изменения копятся в наборе "грязных" ключей и раз в flush_interval секунд
+    сохраняются одной транзакцией. close() сбрасывает всё несохранённое.
+
+    Контексты, к которым не обращались idle_ttl секунд, удаляются по куче
+    таймеров: такой контекст при следующем сообщении начинается с чистого
+    листа. Сверх max_contexts из памяти вытесняются давно не использованные
+    уже сохранённые контексты; в БД они остаются и подгружаются снова.
+    Пустые контексты в этот предел не входят: о них помнится только ключ,
+    чтобы не ходить в БД за каждым апдейтом пользователя вне сценария.
+    """
+
+    def __init__(self, flush_interval: float, idle_ttl: float, max_contexts: int):
+        self.flush_interval = flush_interval
+        self.idle_ttl = idle_ttl
+        self.max_contexts = max_contexts
+        self.key_builder = DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._records: "OrderedDict[str, FsmRecord]" = OrderedDict()
+        # Ключи, для которых в БД точно нет записи
+        self._empty: "OrderedDict[str, None]" = OrderedDict()
+        # Удалённые из памяти контексты, удаление которых ещё не зафиксировано в БД
+        self._tombstones: Set[str] = set()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._dirty: Set[str] = set()
+        self._in_flight: Set[str] = set()
+        self._flusher: Optional[asyncio.Task] = None
+        self._purged = False
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def _touch(self, storage_key: str, record: FsmRecord):
+        record.expires_at = time.monotonic() + self.idle_ttl
+        heapq.heappush(self._expiry_heap, (record.expires_at, storage_key))
+        self._records.move_to_end(storage_key)
+
+    def _remember_empty(self, storage_key: str):
+        self._empty[storage_key] = None
+        self._empty.move_to_end(storage_key)
+        if len(self._empty) > self.max_contexts:
+            self._empty.popitem(last=False)
+
+    async def _find(self, key: StorageKey) -> Tuple[str, Optional[FsmRecord]]:
+        """Контекст из памяти или из БД; None, если контекст пуст"""
+        storage_key = self.key_builder.build(key)
+        record = self._records.get(storage_key)
+        if record is not None:
+            self._touch(storage_key, record)
+            return storage_key, record
+
+        if storage_key in self._empty:
+            self._empty.move_to_end(storage_key)
+            return storage_key, None
+        if storage_key in self._tombstones:
+            # В БД ещё лежит удаляемый контекст, читать его нельзя
+            return storage_key, None
+
+        async with get_db().reader() as conn:
+            cursor = await conn.execute(
+                "SELECT state, data FROM fsm_storage WHERE storage_key = ?",
+                (storage_key,)
+            )
+            row = await cursor.fetchone()
+
+        # Пока шёл запрос, контекст мог появиться из другого апдейта
+        record = self._records.get(storage_key)
+        if record is None and row is not None:
+            record = self._records[storage_key] = FsmRecord(row[0], json.loads(row[1]), row[1])
+        if record is None:
+            self._remember_empty(storage_key)
+            return storage_key, None
+
+        self._touch(storage_key, record)
+        self._evict_overflow()
+        return storage_key, record
+
+    async def _record(self, key: StorageKey) -> FsmRecord:
+        """Контекст для записи: пустой создаётся в памяти"""
+        storage_key, record = await self._find(key)
+        if record is None:
+            record = self._records[storage_key] = FsmRecord()
+            self._empty.pop(storage_key, None)
+            # Новая запись в памяти важнее незафиксированного удаления: их
+            # сохранение встанет в очередь после него
+            self._tombstones.discard(storage_key)
+            self._touch(storage_key, record)
+        return record
+
+    def _evict_overflow(self):
+        excess = len(self._records) - self.max_contexts
+        if excess <= 0:
+            return
+
+        # Вытесняем только сохранённые контексты: их содержимое уже в БД
+        victims = []
+        for storage_key in self._records:
+            if len(victims) == excess:
+                break
+            if storage_key not in self._dirty and storage_key not in self._in_flight:
+                victims.append(storage_key)
+        for storage_key in victims:
+            del self._records[storage_key]
+        self.evicted_lru += len(victims)
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, storage_key = heapq.heappop(heap)
+            record = self._records.get(storage_key)
+            # Устаревшие элементы кучи остаются после каждого обращения к ключу
+            if record is None or record.expires_at != expires_at:
+                continue
+            if not record.is_empty:
+                self.evicted_idle += 1
+            del self._records[storage_key]
+            self._tombstones.add(storage_key)
+            self._dirty.add(storage_key)
+
+        if len(heap) > 4 * len(self._records) + 1024:
+            self._expiry_heap = [(r.expires_at, k) for k, r in self._records.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _mark_dirty(self, key: StorageKey):
+        self._dirty.add(self.key_builder.build(key))
+        self._ensure_flusher()
+        self._evict_overflow()
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop(), name="fsm-storage-flush")
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        self._ensure_flusher()
+        _, record = await self._find(key)
+        return record.state if record is not None else None
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise DataNotDictLikeError(
+                f"Data must be a dict or dict-like object, got {type(data).__name__}"
+            )
+        record = await self._record(key)
+        record.data = data.copy()
+        record.payload = json.dumps(record.data, ensure_ascii=False)
+        self._mark_dirty(key)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, record = await self._find(key)
+        return record.data.copy() if record is not None else {}
+
+    def stats(self) -> Dict[str, Any]:
+        live = [r for r in self._records.values() if not r.is_empty]
+        return {
+            "contexts": len(self._records),
+            "live_contexts": len(live),
+            "approx_bytes": sum(len(r.payload) + len(r.state or "") for r in live),
+            "empty_keys": len(self._empty),
+            "dirty": len(self._dirty),
+            "tombstones": len(self._tombstones),
+            "evicted_idle": self.evicted_idle,
+            "evicted_lru": self.evicted_lru,
+        }
+
+    async def flush(self):
+        if not self._dirty:
+            return
+
+        keys, self._dirty = self._dirty, set()
+        self._in_flight = keys
+        upserts = []
+        deletes = []
+        for storage_key in keys:
+            record = self._records.get(storage_key)
+            if record is None or record.is_empty:
+                deletes.append(storage_key)
+            else:
+                upserts.append((storage_key, record.state, record.payload))
+
+        try:
+            async with get_db().writer() as conn:
+                if upserts:
+                    await conn.executemany(
+                        """
+                        INSERT INTO fsm_storage (storage_key, state, data, updated_at)
+                        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                        ON CONFLICT (storage_key) DO UPDATE
+                        SET state = excluded.state, data = excluded.data, updated_at = excluded.updated_at
+                        """,
+                        upserts
+                    )
+                if deletes:
+                    await conn.executemany(
+                        "DELETE FROM fsm_storage WHERE storage_key = ?",
+                        [(storage_key,) for storage_key in deletes]
+                    )
+        except Exception as e:
+            logger.error(f"Не удалось сохранить состояния FSM: {e}")
+            self._dirty |= keys
+            raise
+        finally:
+            self._in_flight = set()
+
+        # Удаление зафиксировано: пустые контексты больше не держим в памяти
+        for storage_key in deletes:
+            if storage_key in self._dirty:
+                continue
+            self._tombstones.discard(storage_key)
+            record = self._records.get(storage_key)
+            if record is None or record.is_empty:
+                self._records.pop(storage_key, None)
+                self._remember_empty(storage_key)
+
+    async def purge_expired(self):
+        """Удаляет из БД контексты, брошенные до запуска процесса."""
+        async with get_db().writer() as conn:
+            cursor = await conn.execute(
+                "DELETE FROM fsm_storage WHERE updated_at < datetime('now', ?)",
+                (f"-{int(self.idle_ttl)} seconds",)
+            )
+            if cursor.rowcount:
+                logger.info(f"Удалено просроченных FSM-контекстов: {cursor.rowcount}")
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                if not self._purged:
+                    self._purged = True
+                    await self.purge_expired()
+                self._evict_expired()
+                await self.flush()
+            except Exception:
+                logger.exception("Ошибка фонового сохранения FSM-хранилища")
+            await asyncio.sleep(self.flush_interval)
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
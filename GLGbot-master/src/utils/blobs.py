@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from typing import AsyncGenerator, BinaryIO, Tuple
+
+from aiogram import Bot
+
+from src.config import config, logger
+from src.database.crud import get_referenced_blob_paths
+from src.utils.fileio import run_io
+
+
+BLOBS_DIR = "blobs"
+CHUNK_SIZE = 256 * 1024
+
+
+class HashingWriter:
+    """Пишет файл и считает SHA-256 по мере скачивания; вызывается в пуле ввода-вывода"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> int:
+        self.hash.update(chunk)
+        self.size += len(chunk)
+        return self.file.write(chunk)
+
+
+def blobs_root() -> str:
+    return os.path.join(config.files_dir, BLOBS_DIR)
+
+
+def blob_path(content_hash: str, extension: str) -> str:
+    """files/blobs/ab/cd/abcd...ef.jpg — два уровня каталогов по префиксу хэша"""
+    return os.path.join(
+        blobs_root(), content_hash[:2], content_hash[2:4], f"{content_hash}{extension}"
+    )
+
+
+async def _file_chunks(bot: Bot, file_path: str) -> AsyncGenerator[bytes, None]:
+    if bot.session.api.is_local:
+        # Локальный Bot API отдаёт путь на диске вместо URL
+        local_path = bot.session.api.wrap_local_file.to_local(file_path)
+        file = await run_io(open, local_path, "rb")
+        try:
+            while chunk := await run_io(file.read, CHUNK_SIZE):
+                yield chunk
+        finally:
+            await run_io(file.close)
+        return
+
+    url = bot.session.api.file_url(bot.token, file_path)
+    async for chunk in bot.session.stream_content(url=url, chunk_size=CHUNK_SIZE):
+        yield chunk
+
+
+def _publish_blob(tmp_path: str, path: str) -> bool:
+    """Переносит скачанный файл на место блоба; False, если такой блоб уже есть"""
+    if os.path.exists(path):
+        os.utime(path)
+        os.remove(tmp_path)
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _discard(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def store_blob(bot: Bot, file_id: str) -> Tuple[str, str]:
+    """Скачивает файл Telegram в хранилище, возвращает (путь, хэш).
+
+    Одинаковое содержимое хранится один раз: если блоб уже есть,
+    скачанная копия удаляется, а существующему обновляется mtime,
+    чтобы сборщик мусора не удалил его до записи ссылки в БД.
+    """
+    file_info = await bot.get_file(file_id)
+    extension = os.path.splitext(file_info.file_path)[1].lower() or ".unknown"
+
+    tmp_dir = os.path.join(blobs_root(), "tmp")
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+    await run_io(os.makedirs, tmp_dir, exist_ok=True)
+
+    try:
+        file = await run_io(open, tmp_path, "wb")
+        try:
+            writer = HashingWriter(file)
+            async for chunk in _file_chunks(bot, file_info.file_path):
+                await run_io(writer.write, chunk)
+        finally:
+            await run_io(file.close)
+
+        content_hash = writer.hash.hexdigest()
+        path = blob_path(content_hash, extension)
+        if await run_io(_publish_blob, tmp_path, path):
+            logger.info(f"Файл сохранён: {path} ({writer.size} байт)")
+        else:
+            logger.info(f"Файл уже есть в хранилище: {path}")
+    except BaseException:
+        await run_io(_discard, tmp_path)
+        raise
+
+    return path, content_hash
+
+
+def _remove_unreferenced_blobs(referenced: set, grace: float) -> int:
+    if not os.path.isdir(blobs_root()):
+        return 0
+
+    deadline = time.time() - grace
+    orphans = []
+    for directory, _, names in os.walk(blobs_root()):
+        for name in names:
+            path = os.path.join(directory, name)
+            if path not in referenced and os.path.getmtime(path) < deadline:
+                orphans.append(path)
+
+    removed = 0
+    for path in orphans:
+        # Блоб могли переиспользовать, пока шёл обход
+        if os.path.getmtime(path) < time.time() - grace:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+async def collect_garbage(grace: float = None) -> int:
+    """Удаляет блобы, на которые не ссылается ни один документ.
+
+    Файлы моложе grace секунд не трогаем: это недокачанные загрузки
+    и блобы, ссылка на которые ещё не записана в БД.
+    """
+    if grace is None:
+        grace = config.blob_gc_grace
+
+    referenced = await get_referenced_blob_paths()
+    removed = await run_io(_remove_unreferenced_blobs, referenced, grace)
+
+    if removed:
+        logger.info(f"Сборщик мусора удалил {removed} неиспользуемых файлов")
+    return removed
+
+
+async def blob_gc_loop():
+    while True:
+        try:
+            await collect_garbage()
+        except Exception as e:
+            logger.error(f"Ошибка сборки мусора в хранилище файлов: {e}")
+        await asyncio.sleep(config.blob_gc_interval)
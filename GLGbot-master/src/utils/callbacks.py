@@ -0,0 +1,65 @@
+"""Схемы callback_data инлайн-кнопок.
+
+Префикс схемы — короткий код и номер версии: "ac1:15" вместо
+"accept_order:15", так что в 64 байта Telegram помещается больше полей.
+При изменении полей схемы версия увеличивается: кнопки в старых сообщениях
+сохраняют прежний префикс, и CallbackTable отвечает на них предупреждением
+об устаревшей кнопке, а не разбирает по новой схеме. Чтобы старые кнопки
+продолжали работать, прежний префикс той же структуры передаётся в aliases.
+"""
+from enum import Enum
+from typing import Literal, Optional
+
+from aiogram.filters.callback_data import CallbackData
+
+
+class DeliveryStage(str, Enum):
+    loading = "loading"
+    on_way = "on_way"
+    waiting = "waiting"
+    completed = "completed"
+
+
+class AcceptOrder(CallbackData, prefix="ac1"):
+    order_id: int
+
+
+class ViewOrder(CallbackData, prefix="vo1"):
+    order_id: int
+
+
+class MarkDelivered(CallbackData, prefix="md1"):
+    order_id: int
+
+
+class ConfirmDelivery(CallbackData, prefix="cd1"):
+    order_id: int
+
+
+class ViewDocuments(CallbackData, prefix="vd1"):
+    order_id: int
+
+
+class OrdersPage(CallbackData, prefix="op1"):
+    page: int
+    # n — следующая страница после cursor, p — предыдущая перед ним
+    direction: Optional[Literal["n", "p"]] = None
+    cursor: Optional[str] = None
+
+
+class MyOrdersSummary(CallbackData, prefix="ms1"):
+    pass
+
+
+class MyOrders(CallbackData, prefix="mo1"):
+    status: str
+    page: int
+
+
+class DeliveryStageUpdate(CallbackData, prefix="st1"):
+    stage: DeliveryStage
+    order_id: int
+
+
+class DeleteSubscription(CallbackData, prefix="sd1"):
+    sub_id: int
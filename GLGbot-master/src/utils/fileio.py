@@ -0,0 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from src.config import config
+
+
+# Ограниченный пул для работы с файлами бота. Исполнитель цикла по
+# умолчанию не трогаем: через него aiogram выполняет синхронные фильтры
+# (asyncio.to_thread), и медленный диск не должен их задерживать.
+_io_executor = ThreadPoolExecutor(
+    max_workers=config.io_workers,
+    thread_name_prefix="file-io",
+)
+
+
+async def run_io(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, partial(func, *args, **kwargs))
+
+
+def shutdown_io_executor():
+    _io_executor.shutdown(wait=True)
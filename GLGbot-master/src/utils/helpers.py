@@ -1,11 +1,6 @@
-import os
 import re
-from datetime import datetime
-from typing import Optional
-
-from aiogram import Bot
-
-from src.config import config, logger
+from datetime import date, datetime
+from typing import Optional, Tuple
 
 
 def format_order_info(
@@ -43,29 +38,33 @@ def get_status_emoji(status: str) -> str:
     return statuses.get(status, "❓")
 
 
-def get_role_text(role: str) -> str:
-    return "Отправитель" if role == "sender" else "Перевозчик"
-
+def get_status_text(status: str) -> str:
+    statuses = {
+        "new": "Новая",
+        "accepted": "Принята",
+        "in_progress": "В пути",
+        "completed": "Завершена",
+        "cancelled": "Отменена"
+    }
+    return statuses.get(status, status)
 
-async def save_document(bot: Bot, file_id: str, order_id: int, file_name: str) -> str:
-    file_info = await bot.get_file(file_id)
-    file_path_bot = file_info.file_path
 
-    file_extension = os.path.splitext(file_path_bot)[1]
-    if not file_extension:
-        file_extension = ".unknown"
+def encode_order_cursor(creation_date: str, order_id: int) -> str:
+    """Упаковывает курсор страницы заказов в callback_data: 20250314161606.12"""
+    return f"{re.sub(r'[^0-9]', '', str(creation_date))}.{order_id}"
 
-    directory = os.path.join(config.files_dir, str(order_id))
-    os.makedirs(directory, exist_ok=True)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    new_filename = f"{timestamp}_{file_name}{file_extension}"
-    file_path = os.path.join(directory, new_filename)
+def decode_order_cursor(value: str) -> Tuple[str, int]:
+    digits, order_id = value.split(".")
+    creation_date = (
+        f"{digits[0:4]}-{digits[4:6]}-{digits[6:8]} "
+        f"{digits[8:10]}:{digits[10:12]}:{digits[12:14]}"
+    )
+    return creation_date, int(order_id)
 
-    await bot.download(file_id, destination=file_path)
 
-    logger.info(f"Файл сохранён: {file_path}")
-    return file_path
+def get_role_text(role: str) -> str:
+    return "Отправитель" if role == "sender" else "Перевозчик"
 
 
 def normalize_phone(phone: str) -> str:
@@ -86,6 +85,30 @@ def is_valid_email(email: str) -> bool:
     return bool(re.match(pattern, email))
 
 
+def parse_pickup_date(text: str) -> Optional[date]:
+    """Дата из "ДД.ММ.ГГГГ" или "ДД.ММ.ГГГГ ЧЧ:ММ"; None, если не разобрать"""
+    try:
+        return datetime.strptime(text.strip().split()[0], "%d.%m.%Y").date()
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_weight_range(text: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
+    """"100-500", "от 100", "до 500" -> (мин, макс); None, если формат не подошёл"""
+    text = text.strip().lower().replace(",", ".")
+    try:
+        if text.startswith("от"):
+            return float(text[2:]), None
+        if text.startswith("до"):
+            return None, float(text[2:])
+        low, high = (float(part) for part in text.split("-"))
+    except ValueError:
+        return None
+    if low < 0 or high < low:
+        return None
+    return low, high
+
+
 def is_valid_weight(weight_str: str) -> bool:
     try:
         weight = float(weight_str.replace(",", "."))
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, Optional
+
+from src.config import logger
+
+
+class LoopLagMonitor:
+    """Сторож цикла событий.
+
+    Задача в цикле раз в interval секунд отмечает "пульс". Отдельный поток
+    проверяет его: если цикл не отвечает дольше threshold, в лог пишется
+    стек потока цикла — то место, где его заблокировали. Когда цикл
+    оживает, в лог уходит итоговая длительность задержки.
+    """
+
+    def __init__(self, threshold: float, interval: float):
+        self.threshold = threshold
+        self.interval = interval
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._stalls = 0
+        self._max_lag = 0.0
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = now - expected
+            self._max_lag = max(self._max_lag, lag)
+            if lag > self.threshold:
+                logger.warning(f"Цикл событий был заблокирован на {lag * 1000:.0f} мс")
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            if time.monotonic() - beat <= self.threshold or beat == reported_beat:
+                continue
+            # О каждой блокировке сообщаем один раз, пока цикл не отметится снова
+            reported_beat = beat
+            self._stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "стек недоступен"
+            logger.warning(
+                f"Цикл событий не отвечает дольше {self.threshold * 1000:.0f} мс, "
+                f"текущий стек:\n{stack}"
+            )
+
+    def stats(self) -> Dict[str, float]:
+        return {"stalls": self._stalls, "max_lag": self._max_lag}
@@ -32,3 +32,12 @@ class OrderCreationStates(StatesGroup):
 
 class OrderSearchStates(StatesGroup):
     waiting_for_filter = State()
+
+
+class SubscriptionStates(StatesGroup):
+    waiting_for_cargo_type = State()
+    waiting_for_weight = State()
+    waiting_for_pickup_city = State()
+    waiting_for_delivery_city = State()
+    waiting_for_dates = State()
+    confirmation = State()
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Callable, Dict
+
+from src.config import logger
+
+
+StatsSource = Callable[[], Dict[str, Any]]
+
+_sources: Dict[str, StatsSource] = {}
+
+
+def register_stats(name: str, source: StatsSource):
+    _sources[name] = source
+
+
+def collect_stats() -> Dict[str, Dict[str, Any]]:
+    collected = {}
+    for name, source in _sources.items():
+        try:
+            collected[name] = source()
+        except Exception as e:
+            logger.error(f"Ошибка сбора статистики {name}: {e}")
+    return collected
+
+
+def _format(values: Dict[str, Any]) -> str:
+    return ", ".join(
+        f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in values.items()
+    )
+
+
+async def stats_log_loop(interval: float):
+    """Раз в interval секунд пишет в лог счётчики очередей, кэшей и хранилищ"""
+    while True:
+        await asyncio.sleep(interval)
+        for name, values in collect_stats().items():
+            logger.info(f"Статистика {name}: {_format(values)}")
@@ -0,0 +1,135 @@
+import asyncio
+import hmac
+import secrets
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from src.config import WebhookConfig, logger
+
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """Приём апдейтов через webhook на встроенном aiohttp-сервере.
+
+    Запрос сразу получает 200, апдейт уходит в ограниченную очередь, которую
+    разбирают workers задач. При переполнении очереди отвечаем 503, и Telegram
+    повторит доставку позже. stop() перестаёт принимать запросы и дожидается
+    обработки уже принятых апдейтов.
+
+    Запросы без верного секрета в заголовке отклоняются всегда. Если секрет
+    не задан в настройках, сервер создаёт случайный и передаёт его в
+    set_webhook; без set_webhook такой секрет Telegram не узнает, поэтому
+    запуск отклоняется.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, webhook_config: WebhookConfig):
+        self.dp = dp
+        self.bot = bot
+        self.config = webhook_config
+        self.secret_token = webhook_config.secret_token or secrets.token_urlsafe(32)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=webhook_config.queue_size)
+        self._workers: List[asyncio.Task] = []
+        self._runner: Optional[web.AppRunner] = None
+
+        self.received = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.config.path, self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        received = request.headers.get(SECRET_HEADER, "").encode()
+        if not hmac.compare_digest(received, self.secret_token.encode()):
+            return web.Response(status=401)
+
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return web.Response(status=503, headers={"Retry-After": "1"})
+
+        self.received += 1
+        return web.Response(status=200)
+
+    async def _worker(self):
+        while True:
+            payload = await self.queue.get()
+            try:
+                update = Update.model_validate(payload, context={"bot": self.bot})
+                await self.dp.feed_update(self.bot, update)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Ошибка обработки апдейта из webhook: {e}", exc_info=True)
+            finally:
+                self.queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "received": self.received,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+    async def start(self, set_webhook: bool = True):
+        if not set_webhook and not self.config.secret_token:
+            raise ValueError("Для webhook, зарегистрированного вне бота, задайте webhook.secret_token")
+
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"webhook-worker-{i}")
+            for i in range(self.config.workers)
+        ]
+
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.config.host, self.config.port)
+        await site.start()
+
+        if set_webhook:
+            if not self.config.secret_token:
+                logger.warning(
+                    "webhook.secret_token не задан, используется случайный секрет; "
+                    "для нескольких процессов бота задайте общий"
+                )
+            await self.bot.set_webhook(
+                url=self.config.url,
+                secret_token=self.secret_token,
+                allowed_updates=self.dp.resolve_used_update_types(),
+                drop_pending_updates=False,
+            )
+        logger.info(f"Webhook-сервер слушает {self.config.host}:{self.config.port}{self.config.path}")
+
+    async def stop(self):
+        if self._runner is not None:
+            # Сначала закрываем приём, затем дожидаемся уже принятых апдейтов
+            await self._runner.shutdown()
+
+        try:
+            await asyncio.wait_for(self.queue.join(), self.config.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Не дождались обработки {self.queue.qsize()} апдейтов из очереди webhook")
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None